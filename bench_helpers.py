@@ -0,0 +1,21 @@
+# Helpers shared by the Tic-Tac-Toe benchmarks
+# bench_helpers.py
+# Works under both Python 2.7 and Python 3
+
+# Used by both perf_suite.py (Python 2 and 3) and benchmark.py (Python 3),
+# so that they time the same move sequences.
+
+import random
+
+def random_cells(n, count, seed=0):
+    """Returns count distinct (row, col) cells of an n x n grid in random
+    order (all n * n of them if count is more)
+
+    """
+    rng = random.Random(seed)
+    cells = set()
+    while len(cells) < min(count, n * n):
+        cells.add((rng.randrange(n), rng.randrange(n)))
+    cells = sorted(cells)
+    rng.shuffle(cells)
+    return cells
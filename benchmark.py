@@ -0,0 +1,655 @@
+# Benchmarks for the Tic-Tac-Toe engine (and fizzbuzz.py)
+# benchmark.py
+# Python 3 (uses engine.py)
+
+# Run with: python3 benchmark.py
+# Timings are wall-clock and meant for comparing approaches on the same
+# machine, not as absolute numbers.
+
+import copy
+import json
+import math
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import board_render
+import fizzbuzz
+import nd_grid
+from bench_helpers import random_cells
+from bitboard import BitboardGrid
+from compact_grid import CompactGrid
+from engine import Grid
+from game_records import GameRecords, GameRecordWriter
+from hints import HintService
+from mcts_player import MctsPlayer
+from negamax_player import NegamaxPlayer
+from sparse_grid import SparseGrid
+
+def scan_winner(grid):
+    # The original Grid.winner(), which scanned every victory route after each
+    # move. Kept here as the baseline for comparison.
+    for x in grid._victory_routes:
+        if x >= grid.connects_to_win: return 'O'
+        elif x <= -(grid.connects_to_win): return 'X'
+
+    return False
+
+def per_cell_print_game(game_grid):
+    # The original print_game, which wrote each cell separately. Kept here as
+    # the baseline for comparison.
+    pad_size = int(math.floor(math.log10(game_grid.max_col))) + 1 # max digits
+    sys.stdout.write("\n")
+    sys.stdout.write(' ' * pad_size + ' ')
+
+    for cols in range(game_grid.max_col): # print col numbers
+        sys.stdout.write(str(cols + 1).rjust(pad_size + 1))
+
+    print("\n")
+
+    for rows in range(game_grid.max_row):
+        sys.stdout.write(str(rows + 1).rjust(pad_size + 1)) # print row number
+        for col in range(game_grid.max_col): # print grid elements
+            sys.stdout.write(str(game_grid.cells[rows][col]).rjust(pad_size+1))
+        print("\n")
+
+def time_moves(n, moves, check_winner):
+    """Plays moves on a fresh n x n grid, calling check_winner after each one.
+    Returns seconds per move.
+
+    """
+    grid = Grid(n, n)
+    start = time.perf_counter()
+    for turn, (row, col) in enumerate(moves):
+        grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+        check_winner(grid)
+    return (time.perf_counter() - start) / len(moves)
+
+def bench_winner(sizes=(3, 11, 101, 501, 1001), max_moves=2000):
+    """Compares move + winner latency of the scanning and incremental winner"""
+    print("move + winner latency (usec/move)")
+    print("{:>6} {:>12} {:>12} {:>8}".format("n", "scan", "incremental",
+                                             "speedup"))
+    for n in sizes:
+        moves = random_cells(n, min(n * n, max_moves))
+        scan = time_moves(n, moves, scan_winner)
+        incremental = time_moves(n, moves, Grid.winner)
+        print("{:>6} {:>12.2f} {:>12.2f} {:>7.1f}x".format(
+            n, scan * 1e6, incremental * 1e6, scan / incremental))
+
+def bytes_per_board(grid_class, n, count):
+    """Returns the average bytes allocated by each of count n x n boards"""
+    grid_class(n, n) # build the shared route table outside the measurement
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    boards = [grid_class(n, n) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(boards)
+
+def bench_memory(sizes=(3, 15, 101), count=200):
+    """Reports memory held per board for Grid and CompactGrid"""
+    print("memory per board (bytes)")
+    print("{:>6} {:>12} {:>12} {:>8}".format("n", "Grid", "CompactGrid",
+                                             "ratio"))
+    for n in sizes:
+        grid = bytes_per_board(Grid, n, count)
+        compact = bytes_per_board(CompactGrid, n, count)
+        print("{:>6} {:>12.0f} {:>12.0f} {:>7.1f}x".format(
+            n, grid, compact, grid / compact))
+
+def moves_per_second(grid_class, n, games, seed=0):
+    """Plays games random games to completion on n x n boards, returning
+    moves per second (move orders are generated before timing starts)
+
+    """
+    rng = random.Random(seed)
+    cells = [(row, col) for row in range(n) for col in range(n)]
+    orders = []
+    for i in range(games):
+        rng.shuffle(cells)
+        orders.append(list(cells))
+
+    moves = 0
+    start = time.perf_counter()
+    for order in orders:
+        grid = grid_class(n, n)
+        for turn, (row, col) in enumerate(order):
+            grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+            moves += 1
+            if grid.winner(): break
+    return moves / (time.perf_counter() - start)
+
+def bench_bitboard(sizes=(3, 4, 5, 6, 7, 8), games=5000):
+    """Compares moves/sec of Grid, CompactGrid and BitboardGrid"""
+    print("random game throughput (moves/sec)")
+    print("{:>6} {:>12} {:>12} {:>12} {:>8}".format(
+        "n", "Grid", "CompactGrid", "BitboardGrid", "speedup"))
+    for n in sizes:
+        grid = moves_per_second(Grid, n, games)
+        compact = moves_per_second(CompactGrid, n, games)
+        bits = moves_per_second(BitboardGrid, n, games)
+        print("{:>6} {:>12.0f} {:>12.0f} {:>12.0f} {:>7.1f}x".format(
+            n, grid, compact, bits, bits / grid))
+
+def scan_legal_moves(grid):
+    # Finding the legal moves by scanning the cells for '-', as callers had
+    # to before Grid.legal_moves. Kept here as the baseline for comparison.
+    return [(row, col) for row, cells in enumerate(grid.cells)
+            for col, xo in enumerate(cells) if xo == '-']
+
+def playout_moves_per_second(n, pick_move, games, seed=0):
+    """Plays games random games on n x n Grids, choosing each move with
+    pick_move(grid, rng). Returns moves per second.
+
+    """
+    rng = random.Random(seed)
+    moves = 0
+    start = time.perf_counter()
+    for game in range(games):
+        grid = Grid(n, n)
+        for turn in range(n * n):
+            row, col = pick_move(grid, rng)
+            grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+            moves += 1
+            if grid.winner(): break
+    return moves / (time.perf_counter() - start)
+
+def bench_legal_moves(sizes=(3, 15, 51), moves=20000):
+    """Compares random playouts picking moves by scanning for empty cells with
+    Grid.random_legal_move
+
+    """
+    print("random playouts (moves/sec)")
+    print("{:>6} {:>12} {:>12} {:>8}".format("n", "scan", "index",
+                                             "speedup"))
+    for n in sizes:
+        games = max(1, moves // (n * n))
+        scan = playout_moves_per_second(
+            n, lambda grid, rng: rng.choice(scan_legal_moves(grid)), games)
+        index = playout_moves_per_second(
+            n, lambda grid, rng: grid.random_legal_move(rng), games)
+        print("{:>6} {:>12.0f} {:>12.0f} {:>7.1f}x".format(
+            n, scan, index, index / scan))
+
+def bench_k_in_a_row(sizes=(15, 101, 1001), k=5, moves=2000):
+    """Shows k-in-a-row move latency staying flat as the board grows"""
+    print("{}-in-a-row move + winner latency (usec/move)".format(k))
+    for n in sizes:
+        cells = random_cells(n, min(n * n, moves))
+        grid = Grid(n, n, k)
+        start = time.perf_counter()
+        for turn, (row, col) in enumerate(cells):
+            grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+            grid.winner()
+        elapsed = time.perf_counter() - start
+        print("{:>6} {:>12.2f}".format(n, elapsed / len(cells) * 1e6))
+
+def scan_evaluate(grid, xo):
+    # The same evaluation as Grid.evaluate, found by rescanning the cells of
+    # every route, as a heuristic would have to without the threat counts.
+    # Kept here as the baseline for comparison.
+    n = grid.max_row
+    routes = ([[(row, col) for col in range(n)] for row in range(n)] +
+              [[(row, col) for row in range(n)] for col in range(n)] +
+              [[(i, i) for i in range(n)], [(i, n - 1 - i) for i in range(n)]])
+    other = 'X' if xo == 'O' else 'O'
+    score = 0
+    for route in routes:
+        marks = [grid.cells[row][col] for row, col in route]
+        mine, theirs = marks.count(xo), marks.count(other)
+        if mine and not theirs:
+            score += 4 ** (mine - 1)
+        elif theirs and not mine:
+            score -= 4 ** (theirs - 1)
+    return score
+
+def bench_sparse(sizes=(101, 1001, 100000), moves=500, k=5):
+    """Compares memory and move latency of Grid and SparseGrid for games of
+    moves moves (k in a row) as the board grows
+
+    """
+    print("{} moves of {}-in-a-row: memory (KB) and latency (usec/move)"
+          .format(moves, k))
+    print("{:>8} {:>12} {:>12} {:>12} {:>12}".format(
+        "n", "Grid KB", "Sparse KB", "Grid usec", "Sparse usec"))
+    for n in sizes:
+        cells = random_cells(n, moves)
+        row = [n]
+        for grid_class in (Grid, SparseGrid):
+            if grid_class is Grid and n > 1001: # won't fit in memory
+                row += [float('nan'), float('nan')]
+                continue
+            grid = grid_class(n, n, k)
+            start = time.perf_counter()
+            for turn, (r, c) in enumerate(cells):
+                grid.fill_cell(r, c, 'O' if turn % 2 == 0 else 'X')
+                grid.winner()
+            elapsed = time.perf_counter() - start
+            del grid
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            grid = grid_class(n, n, k)
+            for turn, (r, c) in enumerate(cells):
+                grid.fill_cell(r, c, 'O' if turn % 2 == 0 else 'X')
+            used = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+            row += [used / 1024, elapsed / len(cells) * 1e6]
+        print("{:>8} {:>12.0f} {:>12.0f} {:>12.2f} {:>12.2f}".format(
+            row[0], row[1], row[3], row[2], row[4]))
+
+def bench_evaluation(sizes=(3, 11, 101, 501, 1001), moves=200,
+                     scan_max_size=101):
+    """Shows move + evaluate latency staying flat as the board grows, against
+    rescanning the routes (only up to scan_max_size, beyond that it's slow)
+
+    """
+    print("move + static evaluation latency (usec/move)")
+    print("{:>6} {:>12} {:>12}".format("n", "scan", "incremental"))
+    for n in sizes:
+        cells = random_cells(n, min(n * n, moves))
+        Grid(n, n).fill_cell(0, 0, 'O') # builds the shared route weights
+        timings = []
+        for evaluate in (scan_evaluate, Grid.evaluate):
+            if evaluate is scan_evaluate and n > scan_max_size:
+                timings.append(float('nan'))
+                continue
+            grid = Grid(n, n)
+            start = time.perf_counter()
+            for turn, (row, col) in enumerate(cells):
+                grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+                evaluate(grid, 'O')
+            timings.append((time.perf_counter() - start) / len(cells))
+        print("{:>6} {:>12.2f} {:>12.2f}".format(
+            n, timings[0] * 1e6, timings[1] * 1e6))
+
+def bench_negamax(sizes=(3, 4)):
+    """Solves each grid size from the empty board with NegamaxPlayer"""
+    print("negamax solve from empty board")
+    print("{:>6} {:>10} {:>10} {:>12} {:>9}".format(
+        "n", "seconds", "nodes", "nodes/sec", "tt hits"))
+    for n in sizes:
+        player = NegamaxPlayer()
+        player.choose_move(BitboardGrid(n, n), 'O')
+        stats = player.stats()
+        print("{:>6} {:>10.3f} {:>10} {:>12.0f} {:>8.1%}".format(
+            n, player.search_time, stats['nodes'], stats['nodes_per_sec'],
+            stats['hit_rate']))
+
+def play_vs_random(n, k, player, games, seed=0):
+    """Plays games games on n x n grids (k in a row) between player and a
+    random player, player taking O in half of them. Returns (wins, draws,
+    losses) for player.
+
+    """
+    rng = random.Random(seed)
+    wins = draws = 0
+    for game in range(games):
+        side = 'O' if game % 2 == 0 else 'X'
+        grid = Grid(n, n, k)
+        for turn in range(n * n):
+            xo = 'O' if turn % 2 == 0 else 'X'
+            if xo == side:
+                row, col = player.choose_move(grid, xo)
+            else:
+                row, col = grid.random_legal_move(rng)
+            grid.fill_cell(row, col, xo)
+            if grid.winner(): break
+        if grid.winner() == side:
+            wins += 1
+        elif not grid.winner():
+            draws += 1
+    return wins, draws, games - wins - draws
+
+def bench_mcts(shapes=((3, 3), (9, 4), (15, 5)), budgets=(10, 30, 100, 300),
+               games=20):
+    """Reports MctsPlayer playouts/sec, and its results against a random
+    player as the playout budget grows
+
+    """
+    print("MCTS playouts from the empty board (playouts/sec)")
+    for n, k in shapes:
+        player = MctsPlayer(seconds=1.0)
+        player.choose_move(Grid(n, n, k), 'O')
+        print("{:>6} {:>12.0f}".format("{}/{}".format(n, k),
+                                       player.stats()['playouts_per_sec']))
+    n, k = 7, 4
+    print("MCTS vs random player, {0}x{0} grid, {1} in a row, {2} games"
+          .format(n, k, games))
+    print("{:>10} {:>6} {:>6} {:>6}".format("playouts", "won", "drawn",
+                                            "lost"))
+    for budget in budgets:
+        print("{:>10} {:>6} {:>6} {:>6}".format(budget, *play_vs_random(
+            n, k, MctsPlayer(playouts=budget), games)))
+
+def game_positions(n, games, skip=0, seed=0):
+    """Returns every position (as a string of cells) reached in games random
+    games on an n x n grid, leaving out the first skip of each game
+
+    """
+    positions = []
+    for game in random_games(n, games, seed):
+        cells = ['-'] * (n * n)
+        for turn, cell in enumerate(game):
+            if turn >= skip:
+                positions.append(''.join(cells))
+            cells[cell] = 'O' if turn % 2 == 0 else 'X'
+    return positions
+
+def bench_hints(shapes=((3, 1000, 0), (4, 20, 4))):
+    """Reports HintService queries/sec for the positions of random games
+    (n, games, opening moves left out) with a cold cache, then a warm one
+
+    """
+    print("best move for every position of random games")
+    print("{:>6} {:>8} {:>10} {:>12} {:>10} {:>12}".format(
+        "n", "workers", "positions", "cold q/sec", "cold hits", "warm q/sec"))
+    for n, games, skip in shapes:
+        positions = game_positions(n, games, skip)
+        for workers in sorted({1, os.cpu_count() or 1}):
+            with HintService(workers=workers) as hints:
+                start = time.perf_counter()
+                hints.best_moves(positions)
+                cold = len(positions) / (time.perf_counter() - start)
+                cold_hits = hints.stats()['hit_rate']
+                start = time.perf_counter()
+                hints.best_moves(positions)
+                warm = len(positions) / (time.perf_counter() - start)
+            print("{:>6} {:>8} {:>10} {:>12.0f} {:>9.1%} {:>12.0f}".format(
+                n, workers, len(positions), cold, cold_hits, warm))
+
+def bench_nd_grid(shapes=((3, 2), (4, 3), (5, 3), (4, 4), (5, 4)),
+                  games=200, boards=1000):
+    """Reports the line index cost and board creation and move throughput of
+    NdGrid, per (size, dimensions)
+
+    """
+    print("n^d grids: index built once per shape, then shared")
+    print("{:>6} {:>8} {:>10} {:>12} {:>12}".format(
+        "n^d", "lines", "index ms", "boards/sec", "moves/sec"))
+    rng = random.Random(0)
+    for n, d in shapes:
+        nd_grid._indexes.pop((n, d), None)
+        start = time.perf_counter()
+        lines = nd_grid.line_index(n, d)[0]
+        index_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(boards):
+            nd_grid.NdGrid(n, d)
+        board_rate = boards / (time.perf_counter() - start)
+
+        orders = []
+        for game in range(games):
+            cells = list(range(n ** d))
+            rng.shuffle(cells)
+            orders.append(cells)
+        moves = 0
+        start = time.perf_counter()
+        for cells in orders:
+            grid = nd_grid.NdGrid(n, d)
+            for turn, cell_num in enumerate(cells):
+                grid.fill_cell(grid.coords(cell_num),
+                               'O' if turn % 2 == 0 else 'X')
+                moves += 1
+                if grid.winner(): break
+        move_rate = moves / (time.perf_counter() - start)
+        print("{:>6} {:>8} {:>10.2f} {:>12.0f} {:>12.0f}".format(
+            "{}^{}".format(n, d), len(lines), index_time * 1e3, board_rate,
+            move_rate))
+
+def random_positions(n, count, seed=0):
+    """Returns count positions reached by random play on an n x n grid, each
+    as the list of (row, col, xo) moves leading to it (stopping at a win)
+
+    """
+    rng = random.Random(seed)
+    cells = [(row, col) for row in range(n) for col in range(n)]
+    positions = []
+    for i in range(count):
+        rng.shuffle(cells)
+        grid = Grid(n, n)
+        moves = []
+        for turn, (row, col) in enumerate(cells[:rng.randint(0, n * n)]):
+            xo = 'O' if turn % 2 == 0 else 'X'
+            grid.fill_cell(row, col, xo)
+            moves.append((row, col, xo))
+            if grid.winner(): break
+        positions.append(moves)
+    return positions
+
+def bench_grid_batch(n=4, count=100000):
+    """Compares GridBatch.winners against looping Grid.winner()"""
+    import numpy as np # optional, only this benchmark needs it
+    from grid_batch import GridBatch
+
+    positions = random_positions(n, count)
+    boards = np.zeros((count, n, n), dtype=np.int8)
+    for i, moves in enumerate(positions):
+        for row, col, xo in moves:
+            boards[i, row, col] = 1 if xo == 'O' else -1
+
+    start = time.perf_counter()
+    looped = []
+    for moves in positions:
+        grid = Grid(n, n)
+        for row, col, xo in moves:
+            grid.fill_cell(row, col, xo)
+        looped.append(grid.winner())
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    winners = GridBatch(boards).winners()
+    batch_time = time.perf_counter() - start
+
+    expected = [{'O': 1, 'X': -1}.get(winner, 0) for winner in looped]
+    assert winners.tolist() == expected, "GridBatch disagrees with Grid"
+    print("winner evaluation of {} {}x{} positions (positions/sec)".format(
+        count, n, n))
+    print("{:>12} {:>14.0f}".format("Grid loop", count / loop_time))
+    print("{:>12} {:>14.0f} {:>7.1f}x".format(
+        "GridBatch", count / batch_time, loop_time / batch_time))
+
+def per_second(function, arg, seconds=0.2):
+    """Calls function(arg) repeatedly for about seconds, returning calls/sec"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for i in range(10):
+            function(arg)
+        calls += 10
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return calls / elapsed
+
+def bench_snapshot(sizes=(3, 15, 101)):
+    """Compares Grid.to_bytes/from_bytes and copy.copy with pickle and
+    copy.deepcopy, on grids half filled by random moves
+
+    """
+    print("grid snapshot and restore, half filled grids")
+    print("{:>6} {:>14} {:>12} {:>12} {:>8}".format(
+        "n", "method", "save/sec", "restore/sec", "bytes"))
+    for n in sizes:
+        grid = Grid(n, n)
+        for turn, (row, col) in enumerate(random_cells(n, n * n // 2)):
+            grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+        data = grid.to_bytes()
+        assert Grid.from_bytes(data).__dict__ == grid.__dict__
+        pickled = pickle.dumps(grid, pickle.HIGHEST_PROTOCOL)
+        print("{:>6} {:>14} {:>12.0f} {:>12.0f} {:>8}".format(
+            n, "to/from_bytes", per_second(Grid.to_bytes, grid),
+            per_second(Grid.from_bytes, data), len(data)))
+        print("{:>6} {:>14} {:>12.0f} {:>12.0f} {:>8}".format(
+            n, "pickle", per_second(lambda grid: pickle.dumps(
+                grid, pickle.HIGHEST_PROTOCOL), grid),
+            per_second(pickle.loads, pickled), len(pickled)))
+        print("{:>6} {:>14} {:>12.0f}".format(
+            n, "copy.copy", per_second(copy.copy, grid)))
+        print("{:>6} {:>14} {:>12.0f}".format(
+            n, "copy.deepcopy", per_second(copy.deepcopy, grid)))
+
+def random_games(n, count, seed=0):
+    """Returns count random games played to the end on an n x n grid, each as
+    the list of row-major cell numbers played
+
+    """
+    rng = random.Random(seed)
+    cells = list(range(n * n))
+    games = []
+    for i in range(count):
+        rng.shuffle(cells)
+        grid = Grid(n, n)
+        for turn, cell in enumerate(cells):
+            grid.fill_cell(cell // n, cell % n, 'O' if turn % 2 == 0 else 'X')
+            if grid.winner(): break
+        games.append(cells[:turn + 1])
+    return games
+
+def bench_game_records(sizes=(3, 15), count=100000):
+    """Compares the binary game record format with JSON lines"""
+    print("game archive of {} random games".format(count))
+    print("{:>6} {:>12} {:>12} {:>12} {:>12} {:>12}".format(
+        "n", "format", "bytes/game", "write/sec", "read/sec", "random/sec"))
+    with tempfile.TemporaryDirectory() as directory:
+        for n in sizes:
+            games = random_games(n, count // n)
+            path = os.path.join(directory, "games.jsonl")
+            start = time.perf_counter()
+            with open(path, 'w') as out:
+                for cells in games:
+                    out.write(json.dumps({'size': n, 'connects_to_win': n,
+                                          'moves': cells}) + "\n")
+            write_time = time.perf_counter() - start
+            start = time.perf_counter()
+            with open(path) as lines:
+                read = [json.loads(line)['moves'] for line in lines]
+            read_time = time.perf_counter() - start
+            assert read == games
+            print("{:>6} {:>12} {:>12.1f} {:>12.0f} {:>12.0f} {:>12}".format(
+                n, "JSON lines", os.path.getsize(path) / len(games),
+                len(games) / write_time, len(games) / read_time, "-"))
+
+            path = os.path.join(directory, "games.rec")
+            start = time.perf_counter()
+            with GameRecordWriter(path, n) as writer:
+                for cells in games:
+                    writer.write_game(cells)
+            write_time = time.perf_counter() - start
+            with GameRecords(path) as records:
+                start = time.perf_counter()
+                read = list(records)
+                read_time = time.perf_counter() - start
+                assert read == games
+                order = random.Random(0).sample(range(len(games)),
+                                                len(games))
+                start = time.perf_counter()
+                for game in order:
+                    records[game]
+                random_time = time.perf_counter() - start
+            print("{:>6} {:>12} {:>12.1f} {:>12.0f} {:>12.0f} {:>12.0f}".format(
+                n, "binary", os.path.getsize(path) / len(games),
+                len(games) / write_time, len(games) / read_time,
+                len(games) / random_time))
+
+def frames_per_second(n, draw, frames, out):
+    """Draws frames frames of an n x n grid, making one move between each,
+    with stdout sent to out. Returns frames per second.
+
+    """
+    grid = Grid(n, n)
+    moves = random_cells(n, min(n * n, frames))
+    stdout, sys.stdout = sys.stdout, out
+    try:
+        start = time.perf_counter()
+        for turn in range(frames):
+            row, col = moves[turn % len(moves)]
+            grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+            draw(grid)
+        elapsed = time.perf_counter() - start
+    finally:
+        sys.stdout = stdout
+    return frames / elapsed
+
+def bench_render(sizes=(15, 101, 501), frames=20):
+    """Compares per-cell printing, buffered frames and ANSI diff redraws"""
+    print("board drawing to {} (frames/sec)".format(os.devnull))
+    print("{:>6} {:>12} {:>12} {:>12}".format(
+        "n", "per cell", "buffered", "ansi diff"))
+    with open(os.devnull, 'w') as out:
+        for n in sizes:
+            per_cell = frames_per_second(n, per_cell_print_game, frames, out)
+            buffered = frames_per_second(n, board_render.print_frame, frames,
+                                         out)
+            ansi = frames_per_second(n, board_render.AnsiRenderer(out).draw,
+                                     frames, out)
+            print("{:>6} {:>12.1f} {:>12.1f} {:>12.1f}".format(
+                n, per_cell, buffered, ansi))
+
+def bench_fizzbuzz(maximum=10 ** 6, chunked_maximum=10 ** 8):
+    """Compares printing each fizzbuzz item with write_to's chunked output,
+    both to os.devnull
+
+    """
+    print("fizzbuzz output to {}".format(os.devnull))
+    print("{:>22} {:>12} {:>10}".format("", "numbers/sec", "MB/sec"))
+    with open(os.devnull, 'w') as out:
+        stdout, sys.stdout = sys.stdout, out
+        try:
+            start = time.perf_counter()
+            for x in fizzbuzz.fizzbuzz(maximum): print(x)
+            elapsed = time.perf_counter() - start
+        finally:
+            sys.stdout = stdout
+    size = sum(len(chunk) for chunk in fizzbuzz.fizzbuzz_chunks(maximum))
+    print("{:>22} {:>12.0f} {:>10.1f}".format(
+        "print per item", maximum / elapsed, size / elapsed / 1e6))
+    with open(os.devnull, 'wb') as out:
+        start = time.perf_counter()
+        size = fizzbuzz.write_to(out, chunked_maximum)
+        elapsed = time.perf_counter() - start
+    print("{:>22} {:>12.0f} {:>10.1f}".format(
+        "write_to", chunked_maximum / elapsed, size / elapsed / 1e6))
+
+def bench_fizzbuzz_parallel(maximum=10 ** 8, workers=(1, 2, 4)):
+    """Times fizzbuzz.write_parallel writing to a file with different numbers
+    of worker processes
+
+    """
+    print("fizzbuzz 1..{} written to a file ({} cores)".format(
+        maximum, os.cpu_count()))
+    print("{:>8} {:>10} {:>10}".format("workers", "seconds", "MB/sec"))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fizzbuzz.txt")
+        for count in workers:
+            start = time.perf_counter()
+            size = fizzbuzz.write_parallel(path, maximum, count)
+            elapsed = time.perf_counter() - start
+            print("{:>8} {:>10.2f} {:>10.1f}".format(
+                count, elapsed, size / elapsed / 1e6))
+
+def main():
+    bench_winner()
+    bench_memory()
+    bench_bitboard()
+    bench_legal_moves()
+    bench_k_in_a_row()
+    bench_evaluation()
+    bench_sparse()
+    bench_negamax()
+    bench_mcts()
+    bench_hints()
+    bench_nd_grid()
+    bench_grid_batch()
+    bench_game_records()
+    bench_snapshot()
+    bench_render()
+    bench_fizzbuzz()
+    bench_fizzbuzz_parallel()
+
+if __name__ == "__main__":
+    main()
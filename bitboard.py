@@ -0,0 +1,243 @@
+# Bitboard Tic-Tac-Toe grid for small boards
+# bitboard.py
+# Works under both Python 2.7 and Python 3
+
+# Each player's marks are held in one int, with bit number row * n + col set
+# for every cell they occupy (the same row-major cell numbering used by
+# victory_routes.py). Every route to victory gets a precomputed mask with the
+# bits of its cells set, so a player has completed a route when
+# board & mask == mask. Only the routes through the cell just filled are
+# checked, so a move costs a couple of int operations per touched route.
+
+import victory_routes
+
+MAX_SIZE = 8 # 64 cells, the largest board kept to a single machine word
+
+_masks = {}
+
+def route_masks(size):
+    """Returns a list indexed by v-route holding the bitmask of the cells on
+    that route, cached per grid size.
+
+    """
+    if size not in _masks:
+        masks = [0] * (size + size + 2)
+        for row in range(size):
+            for col in range(size):
+                for x in victory_routes.routes_through(row, col, size):
+                    masks[x] |= 1 << (row * size + col)
+        _masks[size] = masks
+    return _masks[size]
+
+class BitboardGrid(object):
+    """Represents gameboard as a pair of bitboards, can be called to fill
+    individual cells. Same interface as Grid, for grids up to MAX_SIZE.
+
+    """
+    max_row = 0
+    max_col = 0
+    _connects_to_win = 0
+
+    def __init__(self, rows, cols):
+        """Initializes grid with the appropriate number of rows and columns
+        Note: Implementation assumes that rows are equal to columns!
+
+        """
+        if rows != cols: raise ValueError("rows and cols must be equal")
+        if rows > MAX_SIZE:
+            raise ValueError("bitboards support grids up to {0}x{0}".format(
+                MAX_SIZE))
+        self.max_row = rows
+        self.max_col = cols
+        self._connects_to_win = rows
+        self._route_table = victory_routes.route_table(rows)
+        self._route_masks = route_masks(rows)
+        self._o_board = 0
+        self._x_board = 0
+        self._winner = False
+        self._moves = [] # cell number of each move, for undo
+        self._winning_move = 0 # move count when the winner was decided
+
+    @property
+    def cells(self):
+        """List of rows holding '-', 'X' or 'O' for each cell, built from the
+        bitboards (a snapshot; changing it does not change the grid).
+
+        """
+        cells = []
+        for row in range(self.max_row):
+            cells.append([])
+            for col in range(self.max_col):
+                bit = 1 << (row * self.max_col + col)
+                if self._o_board & bit:
+                    cells[row].append('O')
+                elif self._x_board & bit:
+                    cells[row].append('X')
+                else:
+                    cells[row].append('-')
+        return cells
+
+    @property
+    def connects_to_win(self):
+        """Marks in a row needed to win (read-only)"""
+        return self._connects_to_win
+
+    def fill_cell(self, row, col, xo):
+        """Fills specified cell if unoccupied, notes progress to victory
+        conditions, and return true. Returns false if cell occupied and does
+        nothing.
+
+        Arguments:
+        row -- grid row (indexed from zero, e.g. 3x3 grid goes from 0 to 2)
+        col -- grid column (indexed from zero, same as row)
+        xo -- 'X' or 'O' character to specify player
+
+        """
+        if not (0 <= row < self.max_row and 0 <= col < self.max_col):
+            raise IndexError("cell out of range")
+        cell_num = row * self.max_col + col
+        bit = 1 << cell_num
+        if (self._o_board | self._x_board) & bit:
+            return False # don't fill already filled spaces
+
+        if xo == 'O':
+            self._o_board |= bit
+            board = self._o_board
+        elif xo == 'X':
+            self._x_board |= bit
+            board = self._x_board
+        else:
+            raise ValueError("Needs to take X or O")
+
+        self._moves.append(cell_num)
+        if not self._winner:
+            masks = self._route_masks
+            for x in self._route_table[cell_num]:
+                if board & masks[x] == masks[x]:
+                    self._winner = xo
+                    self._winning_move = len(self._moves)
+                    break
+        return True
+
+    def undo(self):
+        """Takes back the most recent move, restoring the grid and winner as
+        they were before it, and returns its (row, col). Raises IndexError if
+        there are no moves to take back.
+
+        """
+        cell_num = self._moves.pop()
+        if len(self._moves) < self._winning_move:
+            self._winner, self._winning_move = False, 0
+        clear = ~(1 << cell_num)
+        self._o_board &= clear
+        self._x_board &= clear
+        return divmod(cell_num, self.max_col)
+
+    def move_history(self):
+        """Returns a list of the (row, col) of every move still on the grid,
+        oldest first, the last being the one undo would take back
+
+        """
+        cols = self.max_col
+        return [divmod(cell_num, cols) for cell_num in self._moves]
+
+    def to_bytes(self):
+        """Returns the grid's whole state as bytes in Grid.to_bytes' format
+        (route counters included, worked out from the bitboards), so it can
+        be restored by BitboardGrid.from_bytes or Grid.from_bytes
+
+        """
+        from engine import pack_grid # engine imports this module lazily
+        o_marks = self._marks_per_route(self._o_board)
+        x_marks = self._marks_per_route(self._x_board)
+        return pack_grid(self.max_row, self.max_col, self._connects_to_win,
+                         ''.join([''.join(row) for row in self.cells]),
+                         [o - x for o, x in zip(o_marks, x_marks)], o_marks,
+                         self._moves, self._winning_move, self._winner)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Returns a new BitboardGrid with the state saved by to_bytes (this
+        class's or Grid's). Raises ValueError for grids a BitboardGrid can't
+        hold.
+
+        """
+        from engine import unpack_grid
+        (rows, cols, connects_to_win, cells, routes, o_marks, moves,
+         winning_move, winner) = unpack_grid(data)
+        if connects_to_win != rows:
+            raise ValueError("bitboards only play a full row to win")
+        grid = cls(rows, cols)
+        for cell_num, mark in enumerate(cells):
+            if mark == 'O':
+                grid._o_board |= 1 << cell_num
+            elif mark == 'X':
+                grid._x_board |= 1 << cell_num
+        grid._moves = moves
+        grid._winning_move = winning_move
+        grid._winner = winner
+        return grid
+
+    def __copy__(self):
+        """Returns an independent copy of the grid (copy.copy(grid))"""
+        grid = self.__class__.__new__(self.__class__)
+        grid.__dict__.update(self.__dict__)
+        grid._moves = self._moves[:]
+        return grid
+
+    def _marks_per_route(self, board):
+        # Returns the number of board's marks on each v-route
+        return [bin(board & mask).count('1') for mask in self._route_masks]
+
+    def threats(self, xo, needed):
+        """Returns how many routes to victory are still open to xo and need
+        needed more of xo's marks, as Grid.threats. Worked out from the
+        bitboards when asked for, in time proportional to the number of
+        routes (at most 18).
+
+        """
+        return self._count_threats()[0][xo][needed]
+
+    def evaluate(self, xo):
+        """Returns the static evaluation of the position for xo, as
+        Grid.evaluate, worked out from the bitboards like threats
+
+        """
+        evaluation = self._count_threats()[1]
+        return evaluation if xo == 'O' else -evaluation
+
+    def _count_threats(self):
+        # engine.count_threats for the marks now on the bitboards
+        from engine import count_threats
+        return count_threats(self._marks_per_route(self._o_board),
+                             self._marks_per_route(self._x_board),
+                             self._connects_to_win)
+
+    def legal_moves(self):
+        """Returns a list of (row, col) for each empty cell. Worked out from
+        the bitboards when asked for (there are at most 64 cells), so that
+        moves don't pay for keeping an index like Grid's.
+
+        """
+        free = ~(self._o_board | self._x_board)
+        cols = self.max_col
+        return [divmod(cell_num, cols)
+                for cell_num in range(self.max_row * cols)
+                if free >> cell_num & 1]
+
+    def random_legal_move(self, rng):
+        """Returns (row, col) of an empty cell picked with rng (a
+        random.Random). Raises ValueError if the grid is full.
+
+        """
+        moves = self.legal_moves()
+        if not moves:
+            raise ValueError("No empty cells to play")
+        return moves[rng.randrange(len(moves))]
+
+    def winner(self):
+        """ Returns X or O if victory conditions (connections in a row) are met
+        for either player, else returns False.
+
+        """
+        return self._winner
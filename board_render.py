@@ -0,0 +1,80 @@
+# Board drawing shared by tictactoe.py and tictactoe3.py
+# board_render.py
+# Works under both Python 2.7 and Python 3
+
+# Each frame is built as one string and written with a single write + flush,
+# rather than one write per cell. Cells are always one character, so a
+# right-justified row is just the padding joined between the cells.
+#
+# AnsiRenderer goes further for terminals that understand ANSI escape codes:
+# after drawing the first frame it only rewrites the cells that changed since
+# the previous one, moving the cursor to each with an escape code, so a turn
+# on a large grid costs a few bytes instead of the whole board.
+
+import math
+import sys
+
+def cell_width(grid):
+    """Returns the characters taken by each cell (and row number) when drawn"""
+    longest_side = max(grid.max_row, grid.max_col)
+    return int(math.floor(math.log10(longest_side))) + 2 # max digits + space
+
+def render_frame(grid):
+    """Returns the whole tic-tac-toe grid, with row and column numbers, as one
+    string
+
+    """
+    width = cell_width(grid)
+    pad = ' ' * (width - 1)
+    lines = ["", ' ' * width + ''.join(
+        [str(col + 1).rjust(width) for col in range(grid.max_col)]), ""]
+    for row, cells in enumerate(grid.cells):
+        lines.append(str(row + 1).rjust(width) + pad + pad.join(cells))
+        lines.append("")
+    lines.append("")
+    return "\n".join(lines)
+
+def print_frame(grid, out=None):
+    """Writes the grid to out (stdout by default) in a single write"""
+    out = out or sys.stdout
+    out.write(render_frame(grid))
+    out.flush()
+
+class AnsiRenderer(object):
+    """Draws a grid on an ANSI terminal, redrawing only changed cells"""
+
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+        self._shown = None # rows of cells as last drawn
+
+    def draw(self, grid):
+        """Draws grid, in full the first time (or if its size changed) and
+        after that by rewriting only the cells that differ from the last
+        frame. Leaves the cursor on the line below the grid with the rest of
+        the screen cleared, ready for prompts.
+
+        """
+        shown = self._shown
+        if (shown is None or len(shown) != grid.max_row or
+                len(shown[0]) != grid.max_col):
+            # clear the screen, cursor to top left, then the whole frame
+            frame = ["\x1b[2J\x1b[H", render_frame(grid)]
+            shown = self._shown = [list(row) for row in grid.cells]
+        else:
+            frame = []
+            width = cell_width(grid)
+            for row, now in enumerate(grid.cells):
+                was = shown[row]
+                if not isinstance(now, list): now = list(now) # cell views
+                if was == now: continue # whole row unchanged
+                for col, xo in enumerate(now):
+                    if xo != was[col]:
+                        # frame lines: blank, column numbers, blank, then
+                        # each row followed by a blank (terminal lines
+                        # count from 1)
+                        frame.append("\x1b[{0};{1}H{2}".format(
+                            4 + 2 * row, width * (col + 2), xo))
+                shown[row] = list(now)
+        frame.append("\x1b[{0};1H\x1b[J".format(4 + 2 * grid.max_row))
+        self.out.write(''.join(frame))
+        self.out.flush()
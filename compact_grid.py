@@ -0,0 +1,213 @@
+# Memory-compact Tic-Tac-Toe grid
+# compact_grid.py
+# Python 3
+
+# Same interface as engine.Grid (fill_cell, undo, winner, legal_moves,
+# random_legal_move, cells, max_row, max_col) for full-row grids, but cells
+# live in one flat bytearray (one byte per cell, row-major) and routes in an
+# array('i'), with __slots__ so there is no per-instance __dict__. Meant for
+# analysis jobs holding thousands of boards in memory; benchmark.py reports
+# bytes per board against Grid. It keeps none of Grid's extras (empty-cell
+# index, threats and evaluate, to_bytes), which would cost the memory saved.
+
+from array import array
+
+import victory_routes
+
+_EMPTY = ord('-')
+
+class _CellRow:
+    """Read-only view of one grid row, indexed by column"""
+    __slots__ = ('_cells', '_offset', '_length')
+
+    def __init__(self, cells, offset, length):
+        self._cells = cells
+        self._offset = offset
+        self._length = length
+
+    def __getitem__(self, col):
+        if not 0 <= col < self._length:
+            raise IndexError("column out of range")
+        return chr(self._cells[self._offset + col])
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for col in range(self._length):
+            yield chr(self._cells[self._offset + col])
+
+class _CellRows:
+    """Read-only view of the grid, so cells[row][col] works as on Grid"""
+    __slots__ = ('_grid',)
+
+    def __init__(self, grid):
+        self._grid = grid
+
+    def __getitem__(self, row):
+        grid = self._grid
+        if not 0 <= row < grid.max_row:
+            raise IndexError("row out of range")
+        return _CellRow(grid._cells, row * grid.max_col, grid.max_col)
+
+    def __len__(self):
+        return self._grid.max_row
+
+    def __iter__(self):
+        for row in range(self._grid.max_row):
+            yield self[row]
+
+class CompactGrid:
+    """Represents gameboard with compact storage, can be called to fill
+    individual cells. Drop-in for engine.Grid on full-row grids wherever
+    only moves, undo, legal moves and the winner are needed (the players,
+    simulations).
+
+    """
+    __slots__ = ('max_row', 'max_col', '_cells', '_victory_routes',
+                 '_connects_to_win', '_route_table', '_winner', '_moves',
+                 '_winning_move')
+
+    def __init__(self, rows, cols):
+        """Initializes grid with the appropriate number of rows and columns
+        Note: Implementation assumes that rows are equal to columns!
+
+        """
+        if rows != cols: raise ValueError("rows and cols must be equal")
+        self.max_row = rows
+        self.max_col = cols
+        self._cells = bytearray(b'-') * (rows * cols)
+        self._victory_routes = array('i', bytes(4 * (rows + cols + 2)))
+        self._connects_to_win = rows
+        self._route_table = victory_routes.route_table(rows)
+        self._winner = False
+        self._moves = array('i') # cell number of each move, for undo
+        self._winning_move = 0 # move count when the winner was decided
+
+    @property
+    def cells(self):
+        """Read-only cells[row][col] view holding '-', 'X' or 'O'"""
+        return _CellRows(self)
+
+    @property
+    def connects_to_win(self):
+        """Marks in a row needed to win (read-only)"""
+        return self._connects_to_win
+
+    def fill_cell(self, row, col, xo):
+        """Fills specified cell if unoccupied, notes progress to victory
+        conditions, and return true. Returns false if cell occupied and does
+        nothing.
+
+        Arguments:
+        row -- grid row (indexed from zero, e.g. 3x3 grid goes from 0 to 2)
+        col -- grid column (indexed from zero, same as row)
+        xo -- 'X' or 'O' character to specify player
+
+        """
+        if xo == 'O':
+            v_incrementer = 1
+        elif xo == 'X':
+            v_incrementer = -1
+        else:
+            raise ValueError("Needs to take X or O")
+
+        if not (0 <= row < self.max_row and 0 <= col < self.max_col):
+            raise IndexError("cell out of range")
+        cell_num = row * self.max_col + col
+        if self._cells[cell_num] != _EMPTY:
+            return False # don't fill already filled spaces
+        self._cells[cell_num] = ord(xo)
+
+        if self._route_table is not None:
+            v_routes_to_log = self._route_table[cell_num]
+        else:
+            v_routes_to_log = victory_routes.routes_through(row, col,
+                                                            self.max_row)
+        routes = self._victory_routes
+        for x in v_routes_to_log:
+            routes[x] += v_incrementer
+            if abs(routes[x]) >= self._connects_to_win:
+                self._winner = self._winner or xo
+        self._moves.append(cell_num)
+        if self._winner and not self._winning_move:
+            self._winning_move = len(self._moves)
+        return True
+
+    def undo(self):
+        """Takes back the most recent move, restoring the cell, progress to
+        victory and winner as they were before it, and returns its (row, col).
+        Raises IndexError if there are no moves to take back.
+
+        """
+        cell_num = self._moves.pop()
+        if len(self._moves) < self._winning_move:
+            self._winner, self._winning_move = False, 0
+        row, col = divmod(cell_num, self.max_col)
+        v_decrementer = -1 if self._cells[cell_num] == ord('O') else 1
+        self._cells[cell_num] = _EMPTY
+
+        if self._route_table is not None:
+            v_routes_to_undo = self._route_table[cell_num]
+        else:
+            v_routes_to_undo = victory_routes.routes_through(row, col,
+                                                             self.max_row)
+        for x in v_routes_to_undo:
+            self._victory_routes[x] += v_decrementer
+        return row, col
+
+    def move_history(self):
+        """Returns a list of the (row, col) of every move still on the grid,
+        oldest first, the last being the one undo would take back
+
+        """
+        cols = self.max_col
+        return [divmod(cell_num, cols) for cell_num in self._moves]
+
+    def __copy__(self):
+        """Returns an independent copy of the grid (copy.copy(grid)), sharing
+        only the read-only route table
+
+        """
+        grid = CompactGrid.__new__(CompactGrid)
+        for name in self.__slots__:
+            setattr(grid, name, getattr(self, name))
+        grid._cells = self._cells[:]
+        grid._victory_routes = self._victory_routes[:]
+        grid._moves = self._moves[:]
+        return grid
+
+    def legal_moves(self):
+        """Returns a list of (row, col) for each empty cell, found by
+        scanning the cells (no index is kept, to keep boards small)
+
+        """
+        cols = self.max_col
+        return [divmod(cell_num, cols)
+                for cell_num, mark in enumerate(self._cells)
+                if mark == _EMPTY]
+
+    def random_legal_move(self, rng):
+        """Returns (row, col) of an empty cell picked with rng (a
+        random.Random), by drawing cells until an empty one comes up while
+        at least a quarter of the grid is empty, else from legal_moves().
+        Raises ValueError if the grid is full.
+
+        """
+        size = len(self._cells)
+        if len(self._moves) == size:
+            raise ValueError("No empty cells to play")
+        if (size - len(self._moves)) * 4 < size: # mostly full
+            moves = self.legal_moves()
+            return moves[rng.randrange(len(moves))]
+        while True:
+            cell_num = rng.randrange(size)
+            if self._cells[cell_num] == _EMPTY:
+                return divmod(cell_num, self.max_col)
+
+    def winner(self):
+        """ Returns X or O if victory conditions (connections in a row) are met
+        for either player, else returns False.
+
+        """
+        return self._winner
@@ -0,0 +1,86 @@
+# Index of the empty cells of a Tic-Tac-Toe grid
+# empty_cells.py
+# Works under both Python 2.7 and Python 3
+
+# Keeps the row-major numbers (row * cols + col) of the empty cells in a list,
+# in no particular order, along with each cell's position in that list. A
+# cell is taken out by moving the last cell of the list into its place, and
+# put back by appending it, so both cost O(1) and finding the legal moves
+# never means scanning the grid for '-'. Both are arrays of C ints rather than
+# lists, so the index costs 8 bytes a cell (a list would hold a boxed int per
+# cell, about 80MB for a 1000x1000 grid). The array module is only imported
+# when the first index is made, as it pulls in collections and would
+# otherwise take most of engine.py's import time.
+
+class EmptyCells(object):
+    """The empty cells of a rows x cols grid. Iterating gives (row, col) for
+    each, len() how many are left.
+
+    """
+    __slots__ = ('_cols', '_cells', '_index')
+
+    def __init__(self, rows, cols):
+        from array import array # see the top of the file
+        self._cols = cols
+        self._cells = array('i', range(rows * cols))
+        self._index = array('i', self._cells) # cell's position in _cells
+
+    def take(self, cell):
+        """Removes cell (by number) from the empty cells"""
+        cells = self._cells
+        last = cells.pop()
+        if last != cell: # fill the gap with the last cell
+            i = self._index[cell]
+            cells[i] = last
+            self._index[last] = i
+
+    def put_back(self, cell):
+        """Makes cell (by number) empty again"""
+        self._index[cell] = len(self._cells)
+        self._cells.append(cell)
+
+    def random(self, rng):
+        """Returns (row, col) of an empty cell chosen with rng (a
+        random.Random). Raises ValueError if there are none.
+
+        """
+        if not self._cells:
+            raise ValueError("No empty cells to play")
+        return divmod(self._cells[rng.randrange(len(self._cells))],
+                      self._cols)
+
+    def copy(self):
+        """Returns an independent copy of the index"""
+        empty = EmptyCells.__new__(EmptyCells)
+        empty._cols = self._cols
+        empty._cells = self._cells[:]
+        empty._index = self._index[:]
+        return empty
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __eq__(self, other):
+        # the same empty cells, whatever order they're kept in
+        return (isinstance(other, EmptyCells) and
+                self._cols == other._cols and
+                len(self._cells) == len(other._cells) and
+                sorted(self._cells) == sorted(other._cells))
+
+    def __ne__(self, other): # not derived from __eq__ in Python 2
+        return not self == other
+
+    __hash__ = None # mutable
+
+    def __iter__(self):
+        cols = self._cols
+        for cell in self._cells:
+            yield divmod(cell, cols)
+
+    def __contains__(self, row_col):
+        row, col = row_col
+        if not 0 <= col < self._cols: return False
+        cell = row * self._cols + col
+        if not 0 <= cell < len(self._index): return False
+        i = self._index[cell]
+        return i < len(self._cells) and self._cells[i] == cell
@@ -0,0 +1,490 @@
+# Tic-Tac-Toe engine: the grid, win detection and moves
+# engine.py
+# Works under both Python 2.7 and Python 3
+
+# Grid and new_grid with no input or output, for the interactive games
+# (tictactoe.py and tictactoe3.py wrap this module), the game server and any
+# tool that only needs to play moves. Importing it loads just the grid's own
+# helpers (victory_routes, empty_cells); the other grid backends are only
+# imported by new_grid when it first picks them, and the players, renderers
+# and front-ends never are, so processes that only play games (pool workers,
+# servers) start quickly. Check with: python3 -X importtime -c "import engine"
+
+import struct
+import sys
+
+import empty_cells
+import victory_routes
+
+_weights = {}
+
+def _route_weights(size):
+    # Returns the evaluation weight of a route holding each number of marks
+    # (index 0 to size) of one player only, cached per grid size: 4 ** (marks
+    # - 1), so a mark nearer completing a route always counts for more
+    if size not in _weights:
+        _weights[size] = [0] + [4 ** (marks - 1)
+                                for marks in range(1, size + 1)]
+    return _weights[size]
+
+def count_threats(o_marks, x_marks, size):
+    """Returns (threats, evaluation) for a full-row grid of the given size
+    whose routes to victory hold o_marks[x] of O's marks and x_marks[x] of
+    X's: threats maps 'O' and 'X' to the number of routes open to them by
+    marks still needed (as read by Grid.threats), evaluation is
+    Grid.evaluate('O'). Takes time proportional to the number of routes.
+
+    """
+    weights = _route_weights(size)
+    threats = {'O': [0] * (size + 1), 'X': [0] * (size + 1)}
+    evaluation = 0
+    for o, x in zip(o_marks, x_marks):
+        if not x:
+            threats['O'][size - o] += 1
+            evaluation += weights[o]
+        if not o:
+            threats['X'][size - x] += 1
+            evaluation -= weights[x]
+    return threats, evaluation
+
+def _to_bytes(values):
+    # array.tobytes, named tostring in Python 2
+    return values.tobytes() if hasattr(values, 'tobytes') else \
+        values.tostring()
+
+def _from_bytes(values, data):
+    # array.frombytes, named fromstring in Python 2
+    if hasattr(values, 'frombytes'):
+        values.frombytes(data)
+    else:
+        values.fromstring(data)
+
+def _text(data):
+    # ascii bytes as a str, which they already are in Python 2
+    return data if isinstance(data, str) else data.decode('ascii')
+
+# Grid.to_bytes format, all little-endian: a header of rows, cols,
+# connects_to_win, moves made and _winning_move (uint32 each) and the winner
+# ('O', 'X' or '-' for none), then the cells row by row as ascii, then (for
+# full-row grids) the route counters (int32 each) and O's marks in each route
+# (uint32 each), then the cell number of each move (uint32 each).
+_HEADER = struct.Struct('<5Ic')
+
+def pack_grid(rows, cols, connects_to_win, cells, routes, o_marks, moves,
+              winning_move, winner):
+    """Returns a grid's state in the Grid.to_bytes format: cells a string of
+    '-', 'X' and 'O' row by row, routes and o_marks lists of the route
+    counters and O's marks per route (empty for k-in-a-row), moves a list of
+    cell numbers and winner 'O', 'X' or False
+
+    """
+    from array import array # pulls in collections, so only when used
+    routes = array('i', routes)
+    o_marks = array('I', o_marks)
+    moves = array('I', moves)
+    if sys.byteorder == 'big': # always stored little-endian
+        routes.byteswap()
+        o_marks.byteswap()
+        moves.byteswap()
+    return b''.join([
+        _HEADER.pack(rows, cols, connects_to_win, len(moves), winning_move,
+                     (winner or '-').encode('ascii')),
+        cells.encode('ascii'),
+        _to_bytes(routes), _to_bytes(o_marks), _to_bytes(moves)])
+
+def unpack_grid(data):
+    """Returns (rows, cols, connects_to_win, cells, routes, o_marks, moves,
+    winning_move, winner) from bytes in the Grid.to_bytes format, as taken by
+    pack_grid
+
+    """
+    from array import array
+    rows, cols, connects_to_win, count, winning_move, winner = \
+        _HEADER.unpack_from(data)
+    pos = _HEADER.size
+    cells = _text(data[pos:pos + rows * cols])
+    pos += rows * cols
+    routes, o_marks = array('i'), array('I')
+    if connects_to_win == rows == cols:
+        size = 4 * (rows + cols + 2)
+        _from_bytes(routes, data[pos:pos + size])
+        _from_bytes(o_marks, data[pos + size:pos + 2 * size])
+        pos += 2 * size
+    moves = array('I')
+    _from_bytes(moves, data[pos:pos + 4 * count])
+    if sys.byteorder == 'big':
+        routes.byteswap()
+        o_marks.byteswap()
+        moves.byteswap()
+    return (rows, cols, connects_to_win, cells, routes.tolist(),
+            o_marks.tolist(), moves.tolist(), winning_move,
+            False if winner == b'-' else _text(winner))
+
+class Grid(object):
+    """Represents gameboard, can be called to fill individual cells"""
+    cells = []
+    max_row = 0
+    max_col = 0
+    _victory_routes = [] # represents each way to win (rows + cols + 2 diags)
+    _connects_to_win = 0
+    _route_table = None # v-routes through each cell, shared per grid size
+    _winner = False # set by fill_cell as soon as a route is completed
+    _count_runs = False # k-in-a-row mode, see _log_run_to_victory
+    _moves = [] # cell number (row * max_col + col) of each move, for undo
+    _winning_move = 0 # number of moves made when the winner was decided
+    _empty = None # EmptyCells index of the cells still '-'
+    _route_marks = None # 'O' and 'X' -> marks each player has in each route
+    _threats = None # 'O' and 'X' -> routes open to them, by marks still needed
+    _evaluation = 0 # see evaluate, kept from O's point of view
+        
+    def __init__(self, rows, cols, connects_to_win=None):
+        """Initializes grid with the appropriate number of rows and columns
+
+        Arguments:
+        rows, cols -- size of the grid
+        connects_to_win -- marks in a row needed to win. Defaults to a full
+        row, which needs rows equal to cols. Anything shorter plays k-in-a-row
+        (gomoku-style), on any rectangular grid.
+
+        """
+        self.cells = [['-' for j in range(cols)] for i in range(rows)]
+        self.max_row = rows
+        self.max_col = cols
+        self._winner = False
+        self._moves = []
+        self._winning_move = 0
+        self._empty = empty_cells.EmptyCells(rows, cols)
+        if connects_to_win is None or connects_to_win == rows == cols:
+            if rows != cols: raise ValueError("rows and cols must be equal")
+            self._victory_routes = [0 for x in range(rows + cols + 2)]
+            self._connects_to_win = rows
+            self._route_table = victory_routes.route_table(rows)
+            self._count_runs = False
+            self._route_marks = {'O': [0] * len(self._victory_routes),
+                                 'X': [0] * len(self._victory_routes)}
+            # every route starts empty, open to both and needing a full row
+            self._threats = {'O': [0] * rows + [len(self._victory_routes)],
+                             'X': [0] * rows + [len(self._victory_routes)]}
+            self._evaluation = 0
+        else:
+            if not 1 < connects_to_win <= max(rows, cols):
+                raise ValueError("connects_to_win must be from 2 up to the "
+                                 "longest side of the grid")
+            self._victory_routes = []
+            self._connects_to_win = connects_to_win
+            self._route_table = None
+            self._count_runs = True
+            self._route_marks = None
+            self._threats = None
+            self._evaluation = 0
+
+    @property
+    def connects_to_win(self):
+        """Marks in a row needed to win (read-only)"""
+        return self._connects_to_win
+
+    def fill_cell(self, row, col, xo):
+        """Fills specified cell if unoccupied, notes progress to victory
+        conditions, and return true. Returns false if cell occupied and does
+        nothing.
+
+        Arguments:
+        row -- grid row (indexed from zero, e.g. 3x3 grid goes from 0 to 2)
+        col -- grid column (indexed from zero, same as row)
+        xo -- 'X' or 'O' character to specify player
+
+        """
+        if not (0 <= row < self.max_row and 0 <= col < self.max_col):
+            raise IndexError("cell out of range") # not wrapped round
+        if self.cells[row][col] != '-':
+            return False # don't fill already filled spaces
+        elif xo != 'O' and xo != 'X':
+            raise ValueError("Needs to take X or O")
+        else:
+            self.cells[row][col] = xo
+            self._log_progress_to_victory(row, col, xo)
+            self._moves.append(row * self.max_col + col)
+            self._empty.take(self._moves[-1])
+            if self._winner and not self._winning_move:
+                self._winning_move = len(self._moves)
+            return True
+
+    def undo(self):
+        """Takes back the most recent move, restoring the cell, progress to
+        victory and winner as they were before it, and returns its (row, col).
+        Costs the same as the move itself, so search code can make and unmake
+        moves instead of copying grids. Raises IndexError if there are no moves
+        to take back.
+
+        """
+        cell_num = self._moves.pop()
+        self._empty.put_back(cell_num)
+        row, col = divmod(cell_num, self.max_col)
+        if len(self._moves) < self._winning_move:
+            self._winner, self._winning_move = False, 0
+        xo = self.cells[row][col]
+        self.cells[row][col] = '-'
+        if not self._count_runs: # reverses _log_progress_to_victory
+            v_decrementer = -1 if xo == 'O' else 1
+            other = 'X' if xo == 'O' else 'O'
+            n = self._connects_to_win
+            mine, theirs = self._route_marks[xo], self._route_marks[other]
+            threats, weights = self._threats, _route_weights(n)
+            for x in self._v_routes_through(row, col):
+                self._victory_routes[x] += v_decrementer
+                marks = mine[x]
+                mine[x] = marks - 1
+                their_marks = theirs[x]
+                if not their_marks:
+                    threats[xo][n - marks] -= 1
+                    threats[xo][n - marks + 1] += 1
+                    self._evaluation += v_decrementer * (weights[marks] -
+                                                         weights[marks - 1])
+                    if marks == 1:
+                        threats[other][n] += 1
+                elif marks == 1:
+                    threats[other][n - their_marks] += 1
+                    self._evaluation += v_decrementer * weights[their_marks]
+        return row, col
+
+    def legal_moves(self):
+        """Returns the empty cells, as a live view (don't change the grid
+        while iterating it) giving (row, col) for each in no particular order.
+        Its len() is the number of moves left, so it's false once the grid is
+        full.
+
+        """
+        return self._empty
+
+    def random_legal_move(self, rng):
+        """Returns (row, col) of an empty cell picked with rng (a
+        random.Random) in constant time. Raises ValueError if the grid is full.
+
+        """
+        return self._empty.random(rng)
+
+    def move_history(self):
+        """Returns a list of the (row, col) of every move still on the grid,
+        oldest first, the last being the one undo would take back
+
+        """
+        cols = self.max_col
+        return [divmod(cell_num, cols) for cell_num in self._moves]
+
+    def to_bytes(self):
+        """Returns the grid's whole state (cells, progress to victory and the
+        moves for undo) as bytes, for checkpointing games or sending them to
+        other processes. Rebuild it with Grid.from_bytes (or grid_from_bytes
+        for whichever backend new_grid would pick).
+
+        """
+        return pack_grid(self.max_row, self.max_col, self._connects_to_win,
+                         ''.join([''.join(row) for row in self.cells]),
+                         self._victory_routes,
+                         self._route_marks['O'] if self._route_marks else [],
+                         self._moves, self._winning_move, self._winner)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Returns a new grid with the state saved by to_bytes. The route
+        counters are read back as they were, not rebuilt by replaying the
+        moves, so restoring costs about as much as copying the bytes.
+
+        """
+        (rows, cols, connects_to_win, cells, routes, o_marks, moves,
+         winning_move, winner) = unpack_grid(data)
+        grid = cls.__new__(cls)
+        grid.max_row, grid.max_col = rows, cols
+        grid._connects_to_win = connects_to_win
+        grid._count_runs = connects_to_win != rows or rows != cols
+        grid.cells = [list(cells[i:i + cols])
+                      for i in range(0, rows * cols, cols)]
+        grid._victory_routes = routes
+        grid._moves = moves
+        grid._route_marks = grid._threats = None
+        grid._evaluation = 0
+        if not grid._count_runs:
+            grid._count_threats(o_marks)
+        grid._empty = empty_cells.EmptyCells(rows, cols)
+        for cell_num in grid._moves:
+            grid._empty.take(cell_num)
+        grid._winning_move = winning_move
+        grid._winner = winner
+        grid._route_table = (None if grid._count_runs else
+                             victory_routes.route_table(rows))
+        return grid
+
+    def _count_threats(self, o_marks):
+        # Sets the per-route marks, _threats and _evaluation from O's marks in
+        # each route (X's being O's less the net count in _victory_routes),
+        # in time proportional to the number of routes
+        x_marks = [o - net for o, net in zip(o_marks, self._victory_routes)]
+        self._route_marks = {'O': o_marks, 'X': x_marks}
+        self._threats, self._evaluation = count_threats(
+            o_marks, x_marks, self._connects_to_win)
+
+    def __copy__(self):
+        """Returns an independent copy of the grid (copy.copy(grid)), sharing
+        only the read-only route table
+
+        """
+        grid = self.__class__.__new__(self.__class__)
+        grid.__dict__.update(self.__dict__)
+        grid.cells = [row[:] for row in self.cells]
+        grid._victory_routes = self._victory_routes[:]
+        if self._route_marks:
+            grid._route_marks = {xo: marks[:] for xo, marks in
+                                 self._route_marks.items()}
+            grid._threats = {xo: counts[:] for xo, counts in
+                             self._threats.items()}
+        grid._moves = self._moves[:]
+        grid._empty = self._empty.copy()
+        return grid
+
+    def _v_routes_through(self, row, col):
+        # Returns the v-routes (see _log_progress_to_victory) through a cell
+        if self._route_table is not None:
+            return self._route_table[row * self.max_col + col]
+        else:
+            return victory_routes.routes_through(row, col, self.max_row)
+
+    def _log_progress_to_victory(self, row, col, xo):
+        # Logs the progress of X and O to victory through incrementing an array
+        # holding 'routes' to victory (each row, column, & diagonal is a
+        # route). O is represented with positives, X with negatives. A player
+        # has won when any route contains abs(_connects_to_win). Implemented
+        # this way to scale better than calling the more intuitive but costly
+        # recursive traversal across the grid for each cell (or subset of
+        # cells) to see if it's in a row.
+
+        v_incrementer = 0 # use proper sign for X vs O
+        if xo == 'O':
+            v_incrementer = 1
+        elif xo == 'X':
+            v_incrementer = -1
+        else:
+            raise ValueError("Needs to take X or O")
+
+        if self._count_runs:
+            self._log_run_to_victory(row, col, xo)
+            return
+
+        # This is essentially the third and final coordinate system, which
+        # gives each route to victory its own array element (see
+        # victory_routes.py for how a cell maps onto its routes)
+        v_routes_to_log = self._v_routes_through(row, col)
+
+        # Track progress in each route to victory. Only the routes touched by
+        # this move can newly reach _connects_to_win, so the winner is noted
+        # here rather than rescanning every route in winner()
+        #
+        # Each player's own marks per route are counted too, so a route still
+        # open to one player (holding none of the other's marks) can be told
+        # from a dead one. _threats counts the open routes by marks still
+        # needed and _evaluation sums their weights, both changed only for
+        # the routes this move touches.
+        other = 'X' if xo == 'O' else 'O'
+        n = self._connects_to_win
+        mine, theirs = self._route_marks[xo], self._route_marks[other]
+        threats, weights = self._threats, _route_weights(n)
+        for x in v_routes_to_log:
+            self._victory_routes[x] += v_incrementer
+            if abs(self._victory_routes[x]) >= n:
+                self._winner = self._winner or xo
+            marks = mine[x] + 1
+            mine[x] = marks
+            their_marks = theirs[x]
+            if not their_marks: # still open to xo, now needing one fewer
+                threats[xo][n - marks + 1] -= 1
+                threats[xo][n - marks] += 1
+                self._evaluation += v_incrementer * (weights[marks] -
+                                                     weights[marks - 1])
+                if marks == 1: # was empty, now closed to the other player
+                    threats[other][n] -= 1
+            elif marks == 1: # was open to the other player, now dead
+                threats[other][n - their_marks] -= 1
+                self._evaluation += v_incrementer * weights[their_marks]
+
+    def _log_run_to_victory(self, row, col, xo):
+        # k-in-a-row counterpart to the route counters, where a route would be
+        # any k cells in a line. Counts the player's unbroken marks through
+        # the new cell along each of the 4 directions, walking out at most
+        # k - 1 cells each way, so a move costs O(k) whatever the grid size.
+        k = self._connects_to_win
+        for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            run = 1
+            for sign in (1, -1):
+                r, c = row + sign * d_row, col + sign * d_col
+                while (run < k and 0 <= r < self.max_row and
+                       0 <= c < self.max_col and self.cells[r][c] == xo):
+                    run += 1
+                    r, c = r + sign * d_row, c + sign * d_col
+            if run >= k:
+                self._winner = self._winner or xo
+                return
+        
+    def threats(self, xo, needed):
+        """Returns how many routes to victory are still open to xo (hold
+        none of the other player's marks) and need needed more of xo's marks
+        to complete, e.g. threats('O', 1) for the routes O could win with its
+        next move. Constant time. Full-row grids only, raises ValueError for
+        k-in-a-row.
+
+        """
+        if self._threats is None:
+            raise ValueError("threats are only kept for full-row grids")
+        return self._threats[xo][needed]
+
+    def evaluate(self, xo):
+        """Returns a static evaluation of the position for xo, for use by
+        search: each route open to only one player is worth 4 ** (their
+        marks in it - 1), positive for xo's routes and negative for the
+        other player's. Constant time, as the sum is kept up to date by each
+        move. Full-row grids only, raises ValueError for k-in-a-row.
+
+        """
+        if self._threats is None:
+            raise ValueError("evaluation is only kept for full-row grids")
+        return self._evaluation if xo == 'O' else -self._evaluation
+
+    def winner(self):
+        """ Returns X or O if victory conditions (connections in a row) are met
+        for either player, else returns False. Constant time, as the winner is
+        recorded by fill_cell.
+
+        """
+        return self._winner
+
+SPARSE_MIN_CELLS = 1 << 24 # grids this big are only stored sparsely
+
+def new_grid(rows, cols, connects_to_win=None):
+    """Returns an empty grid with the given number of rows and columns (and
+    optionally marks in a row needed to win, see Grid). Full-row grids up to
+    bitboard.MAX_SIZE are backed by the faster BitboardGrid, grids of
+    SPARSE_MIN_CELLS or more by SparseGrid, which only stores the cells
+    played, and everything else by Grid; all have the same interface.
+
+    """
+    import bitboard # backends load on first use, see the top of the file
+    if (rows == cols and rows <= bitboard.MAX_SIZE and
+            connects_to_win in (None, rows)):
+        return bitboard.BitboardGrid(rows, cols)
+    if rows * cols >= SPARSE_MIN_CELLS:
+        import sparse_grid
+        return sparse_grid.SparseGrid(rows, cols, connects_to_win)
+    return Grid(rows, cols, connects_to_win)
+
+def grid_from_bytes(data):
+    """Returns a new grid with the state saved by any backend's to_bytes, of
+    the class new_grid picks for its size (SparseGrid for SparseGrid's own
+    snapshots)
+
+    """
+    import sparse_grid
+    if data[:len(sparse_grid.MAGIC)] == sparse_grid.MAGIC:
+        return sparse_grid.SparseGrid.from_bytes(data)
+    import bitboard
+    rows, cols, connects_to_win = _HEADER.unpack_from(data)[:3]
+    if rows == cols == connects_to_win and rows <= bitboard.MAX_SIZE:
+        return bitboard.BitboardGrid.from_bytes(data)
+    return Grid.from_bytes(data)
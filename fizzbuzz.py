@@ -6,6 +6,32 @@
 # divisible by 5, print Buzz. If it's divisible by both 3 and 5, print
 # FizzBuzz.
 
+# fizzbuzz_chunks and write_to are for producing a lot of output fast,
+# without a modulo test or a print per number. The answers repeat every 15
+# numbers, and the numbers from 1000q to 1000q + 999 only differ in their
+# last three digits; 3000 being a multiple of 15, the text for those thousand
+# numbers is the same for every q with the same q % 3, apart from the leading
+# digits of q. So the text of each of the three kinds of thousand is built
+# once, with a marker where q's digits go, and output is made a thousand
+# numbers at a time by a str.replace of the marker.
+#
+# Any window of numbers can be produced on its own (fizzbuzz_range), and the
+# byte offset of any number's line in the whole output is a formula
+# (byte_offset), so write_parallel can split a range across processes that
+# each write their part straight into place in one preallocated file.
+#
+# Run with: python fizzbuzz.py [MAXIMUM] [--output FILE [--workers N]]
+#           (1 to 100 to stdout by default)
+
+import argparse
+import io
+import os
+import sys
+
+_BLOCK = 1000 # numbers sharing their leading digits
+_MARK = "\0" # stands for the leading digits in _templates
+_templates = []
+
 def fizzbuzz (maximum):
     for x in range(1, maximum + 1):
         if x % 3 == 0 and x % 5 == 0: yield "FizzBuzz"
@@ -13,17 +39,160 @@ def fizzbuzz (maximum):
         elif x % 5 == 0: yield "Buzz"
         else: yield x
 
-for x in fizzbuzz(100): print (x)
-
-
-
-
-
-
-
-
-
-
-
-
-
+# fizzbuzz's answer for each remainder mod 15, None where it's the number
+_PATTERN = [None if isinstance(answer, int) else answer
+            for answer in list(fizzbuzz(15))[-1:] + list(fizzbuzz(14))]
+
+def term(x):
+    """Returns fizzbuzz's answer for the number x on its own, the same as the
+    generator gives it
+
+    """
+    return _PATTERN[x % 15] or x
+
+def line_bytes(n):
+    """Returns the length of the output for the numbers 1 to n, counting a
+    newline after each line, in time proportional to n's number of digits
+
+    """
+    fizzbuzzes = n // 15
+    words = (5 * (n // 3 - fizzbuzzes) + 5 * (n // 5 - fizzbuzzes) +
+             9 * fizzbuzzes) # 'Fizz\n', 'Buzz\n' and 'FizzBuzz\n'
+    numbers = 0
+    low, digits = 1, 1
+    while low <= n: # numbers printed with each count of digits
+        high = min(n, low * 10 - 1)
+        numbers += (digits + 1) * (_numbers_printed(high) -
+                                   _numbers_printed(low - 1))
+        low, digits = low * 10, digits + 1
+    return words + numbers
+
+def _numbers_printed(n):
+    # How many of 1 to n are printed as numbers (divisible by neither 3 nor 5)
+    return n - n // 3 - n // 5 + n // 15
+
+def byte_offset(x):
+    """Returns where the line for the number x starts in the output for 1 up
+    to anything at least x
+
+    """
+    return line_bytes(x - 1)
+
+def _block_template(q):
+    # The text for the numbers 1000q to 1000q + 999 with _MARK in place of
+    # q's digits, the same for all q with the same q % 3
+    if not _templates:
+        answers = ["FizzBuzz"] + list(fizzbuzz(3 * _BLOCK - 1)) # from 0
+        for kind in range(3):
+            lines = []
+            for last_digits in range(_BLOCK):
+                answer = answers[kind * _BLOCK + last_digits]
+                if isinstance(answer, int):
+                    answer = _MARK + "{:03d}".format(last_digits)
+                lines.append(answer + "\n")
+            _templates.append(''.join(lines))
+    return _templates[q % 3]
+
+def _block(q):
+    # The text for the numbers 1000q to 1000q + 999, q at least 1
+    return _block_template(q).replace(_MARK, str(q))
+
+def _part_of_block(start, stop):
+    # The text for the numbers start to stop - 1, all in the same thousand
+    # (from 1000 up), cut out of the thousand's text by their byte offsets
+    q = start // _BLOCK
+    base = byte_offset(q * _BLOCK)
+    return _block(q)[byte_offset(start) - base:byte_offset(stop) - base]
+
+def fizzbuzz_range(start, stop, blocks_per_chunk=64):
+    """Generator of the fizzbuzz lines for the numbers start to stop - 1 (from
+    1 up), each line ending in a newline, as strings of up to
+    blocks_per_chunk * 1000 lines joined together. Nothing before start is
+    worked out, so any window costs the same to begin.
+
+    """
+    start = max(start, 1)
+    if start < _BLOCK and start < stop: # no padding, so no templates
+        yield ''.join(["{}\n".format(term(x))
+                       for x in range(start, min(stop, _BLOCK))])
+        start = _BLOCK
+    if start >= stop: return
+    first_q = -(-start // _BLOCK) # whole thousands from first_q up to end_q
+    end_q = stop // _BLOCK
+    if first_q > end_q: # start and stop in the same thousand
+        yield _part_of_block(start, stop)
+        return
+    if start < first_q * _BLOCK:
+        yield _part_of_block(start, first_q * _BLOCK)
+    for chunk_q in range(first_q, end_q, blocks_per_chunk):
+        yield ''.join([_block(q) for q in
+                       range(chunk_q, min(chunk_q + blocks_per_chunk, end_q))])
+    if end_q * _BLOCK < stop:
+        yield _part_of_block(end_q * _BLOCK, stop)
+
+def fizzbuzz_chunks(maximum, blocks_per_chunk=64):
+    """Generator of the fizzbuzz lines for 1 to maximum, each line ending in a
+    newline, as strings of blocks_per_chunk * 1000 lines joined together
+    (the first and last may be shorter)
+
+    """
+    return fizzbuzz_range(1, maximum + 1, blocks_per_chunk)
+
+def write_to(fileobj, maximum, blocks_per_chunk=64, start=1):
+    """Writes the fizzbuzz lines for start (1 by default) to maximum to
+    fileobj, a chunk of blocks_per_chunk * 1000 lines per write. fileobj may
+    be a text or binary file. Returns the number of characters written.
+
+    """
+    binary = isinstance(fileobj, (io.RawIOBase, io.BufferedIOBase))
+    written = 0
+    for chunk in fizzbuzz_range(start, maximum + 1, blocks_per_chunk):
+        fileobj.write(chunk.encode('ascii') if binary else chunk)
+        written += len(chunk)
+    return written
+
+def _write_slice(path, start, stop):
+    # Worker for write_parallel: writes the lines for start to stop - 1 into
+    # their place in the file at path
+    with open(path, 'r+b') as out:
+        out.seek(byte_offset(start))
+        return write_to(out, stop - 1, start=start)
+
+def write_parallel(path, maximum, workers=None, slices=None):
+    """Writes the fizzbuzz lines for 1 to maximum to a new file at path. The
+    file is sized up front and split into slices (4 per worker by default),
+    each written straight into its place by one of workers processes (all
+    cores by default). Returns the file's size.
+
+    """
+    from concurrent.futures import ProcessPoolExecutor # Python 3 only
+    workers = workers or os.cpu_count()
+    slices = slices or 4 * workers
+    size = line_bytes(maximum)
+    with open(path, 'wb') as out:
+        out.truncate(size)
+    bounds = [1 + maximum * i // slices for i in range(slices + 1)]
+    with ProcessPoolExecutor(workers) as pool:
+        jobs = [pool.submit(_write_slice, path, start, stop)
+                for start, stop in zip(bounds, bounds[1:]) if start < stop]
+        for job in jobs:
+            job.result() # raises any worker's error
+    return size
+
+def main():
+    parser = argparse.ArgumentParser(description="FizzBuzz")
+    parser.add_argument('maximum', type=int, nargs='?', default=100)
+    parser.add_argument('--output', help="file to write (default: stdout)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes writing --output (default: all "
+                             "cores)")
+    args = parser.parse_args()
+    if args.output:
+        write_parallel(args.output, args.maximum, args.workers)
+    else:
+        out = getattr(sys.stdout, 'buffer', sys.stdout) # bytes, if Python 3
+        write_to(out, args.maximum)
+        out.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# Compact binary archive of Tic-Tac-Toe game records
+# game_records.py
+# Python 3
+
+# Stores any number of games played on one grid size in a single file, each
+# game as the list of cells its moves went in. Cells are numbered row-major
+# (row * size + col, the numbering Grid uses for cell_num) and written as
+# varints: 7 bits per byte, low bits first, the top bit set on every byte
+# but the last, so any cell under 128 (grids up to 11x11) takes one byte.
+#
+# File layout:
+#   MAGIC, varint grid size, varint marks in a row to win (0 for a full row)
+#   each game: varint length in bytes of its moves, then a varint cell per
+#   move
+#   index: the file offset of each game as an 8 byte little-endian number
+#   the number of games as an 8 byte little-endian number
+#
+# The index lets GameRecords read game N straight from a memory-mapped file
+# without touching the games before it, and only the games actually read are
+# ever decoded.
+
+import mmap
+import struct
+from array import array
+
+MAGIC = b'TTTGAMES'
+_OFFSET = struct.Struct('<Q')
+
+def encode_varint(number, out):
+    """Appends number (0 or more) to bytearray out as a varint"""
+    while number >= 0x80:
+        out.append(number & 0x7f | 0x80)
+        number >>= 7
+    out.append(number)
+
+def decode_varint(data, pos):
+    """Returns (number, position after it) for the varint at data[pos]"""
+    number = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        number |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return number, pos
+        shift += 7
+
+class GameRecordWriter:
+    """Writes games to a new record file. Use as a context manager or call
+    close(), which writes the index; a file that was never closed can't be
+    read.
+
+    """
+
+    def __init__(self, path, size, connects_to_win=None, buffer_size=1 << 16):
+        self.size = size
+        self._cells = size * size
+        self._file = open(path, 'wb')
+        self._buffer = bytearray(MAGIC)
+        encode_varint(size, self._buffer)
+        encode_varint(connects_to_win or 0, self._buffer)
+        self._buffer_size = buffer_size
+        self._written = 0 # bytes already passed to the file
+        self._offsets = array('Q')
+
+    def write_game(self, cells):
+        """Appends one game, given as the sequence of row-major cell numbers
+        its moves were played in
+
+        """
+        buffer = self._buffer
+        self._offsets.append(self._written + len(buffer))
+        if self._cells <= 0x80: # every cell fits in one byte
+            encode_varint(len(cells), buffer)
+            buffer.extend(cells)
+        else:
+            moves = bytearray()
+            for cell in cells:
+                encode_varint(cell, moves)
+            encode_varint(len(moves), buffer)
+            buffer += moves
+        if len(buffer) >= self._buffer_size:
+            self._flush()
+
+    def _flush(self):
+        self._file.write(self._buffer)
+        self._written += len(self._buffer)
+        self._buffer = bytearray()
+
+    def close(self):
+        """Writes the index and closes the file"""
+        if self._file.closed: return
+        for offset in self._offsets:
+            self._buffer += _OFFSET.pack(offset)
+        self._buffer += _OFFSET.pack(len(self._offsets))
+        self._flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class GameRecords:
+    """Read-only, memory-mapped view of a file written by GameRecordWriter.
+    Behaves as a sequence of games, each a list of row-major cell numbers.
+
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as record_file:
+            self._mapped = mmap.mmap(record_file.fileno(), 0,
+                                     access=mmap.ACCESS_READ)
+        mapped = self._mapped
+        if mapped[:len(MAGIC)] != MAGIC or len(mapped) < len(MAGIC) + 10:
+            raise ValueError("{} is not a game record file".format(path))
+        self.size, pos = decode_varint(mapped, len(MAGIC))
+        self.connects_to_win, pos = decode_varint(mapped, pos)
+        self.connects_to_win = self.connects_to_win or None
+        self._games = _OFFSET.unpack_from(mapped, len(mapped) - 8)[0]
+        self._index = len(mapped) - 8 * (self._games + 1)
+        if self._index < pos:
+            raise ValueError("{} is truncated".format(path))
+        self._one_byte_cells = self.size * self.size <= 0x80
+
+    def close(self):
+        self._mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._games
+
+    def __getitem__(self, game):
+        """Returns the cells of game number game (from 0)"""
+        if game < 0:
+            game += self._games
+        if not 0 <= game < self._games:
+            raise IndexError("game number out of range")
+        mapped = self._mapped
+        pos = _OFFSET.unpack_from(mapped, self._index + 8 * game)[0]
+        length, pos = decode_varint(mapped, pos)
+        if self._one_byte_cells:
+            return list(mapped[pos:pos + length])
+        cells = []
+        number = shift = 0
+        for byte in mapped[pos:pos + length]: # decode_varint, inlined
+            if byte < 0x80:
+                cells.append(number | byte << shift)
+                number = shift = 0
+            else:
+                number |= (byte & 0x7f) << shift
+                shift += 7
+        return cells
+
+    def __iter__(self):
+        for game in range(self._games):
+            yield self[game]
+
+    def moves(self, game):
+        """Returns the moves of game number game as (row, col) pairs"""
+        return [divmod(cell, self.size) for cell in self[game]]
@@ -0,0 +1,135 @@
+# Headless Tic-Tac-Toe game server
+# game_server.py
+# Python 3
+
+# Hosts any number of games at once in a single process using asyncio, over
+# TCP with a line-based text protocol. Each request is one line and gets one
+# reply line, in order, so clients may send several requests before reading
+# the replies. Rows and columns are numbered from 1, as in the games.
+#
+#   NEW <size> [<in a row to win>]  ->  OK <game id>
+#   MOVE <game id> <row> <col>      ->  OK NEXT <O|X> | OK WIN <O|X> | OK DRAW
+#   STATE <game id>                 ->  OK <size> <turn> <status> <cells>
+#   END <game id>                   ->  OK
+#
+# where <status> is NEXT <O|X>, WIN <O|X> or DRAW as for MOVE and <cells> is
+# the grid row by row as one string of '-', 'X' and 'O'. Anything that
+# fails gets ERR <message> instead. Finished games are kept until ENDed.
+#
+# Grids take memory per cell, so sizes are capped at MAX_SIZE and NEW is
+# refused while the games held add up to MAX_CELLS cells (a 100x100 game
+# costs under 1MB, so all the games together stay within about 1.5GB).
+#
+# Run with: python3 game_server.py [--host HOST] [--port PORT]
+# (load_generator.py drives it with many concurrent games)
+
+import argparse
+import asyncio
+import itertools
+
+from game_session import DRAW, GameSession, IllegalMove
+
+MAX_SIZE = 100 # largest grid a client may ask for
+MAX_CELLS = 1 << 24 # most cells held by all games together
+
+class GameServer:
+    """Holds the games in progress and answers protocol requests"""
+
+    def __init__(self):
+        self.games = {}
+        self.cells = 0 # held by all games, see MAX_CELLS
+        self._ids = itertools.count(1)
+
+    def handle(self, line):
+        """Returns the reply to one request line (without newline)"""
+        words = line.split()
+        if not words:
+            return "ERR Empty request."
+        command = words[0].upper()
+        try:
+            if command == "NEW":
+                return self._new(*[int(word) for word in words[1:]])
+            elif command in ("MOVE", "STATE", "END"):
+                game_id = int(words[1])
+                if game_id not in self.games:
+                    return "ERR No such game."
+                if command == "MOVE":
+                    row, col = [int(word) for word in words[2:]]
+                    return self._move(game_id, row, col)
+                elif command == "STATE":
+                    return self._state(self.games[game_id])
+                else:
+                    game = self.games.pop(game_id)
+                    self.cells -= game.grid.max_row * game.grid.max_col
+                    return "OK"
+            return "ERR Unknown command."
+        except (ValueError, TypeError, IndexError):
+            return "ERR Bad arguments."
+
+    def _new(self, size, connects_to_win=None):
+        if not 2 <= size <= MAX_SIZE:
+            return "ERR Size must be from 2 to {}.".format(MAX_SIZE)
+        if connects_to_win is not None and not 2 <= connects_to_win <= size:
+            return "ERR In a row to win must be from 2 to {}.".format(size)
+        if self.cells + size * size > MAX_CELLS:
+            return "ERR Too many games, END some first."
+        self.cells += size * size
+        game_id = next(self._ids)
+        self.games[game_id] = GameSession(size, size, connects_to_win)
+        return "OK {}".format(game_id)
+
+    def _move(self, game_id, row, col):
+        game = self.games[game_id]
+        try:
+            game.move(row - 1, col - 1)
+        except IllegalMove as e:
+            return "ERR {}".format(e)
+        return "OK " + self._status(game)
+
+    def _status(self, game):
+        if game.result == DRAW:
+            return "DRAW"
+        elif game.result:
+            return "WIN " + game.result
+        return "NEXT " + game.player
+
+    def _state(self, game):
+        cells = ''.join(''.join(row) for row in game.grid.cells)
+        return "OK {} {} {} {}".format(game.grid.max_row, game.turn,
+                                       self._status(game), cells)
+
+    async def serve_client(self, reader, writer):
+        """Answers requests from one connection until it closes"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                reply = self.handle(line.decode('ascii', 'replace'))
+                writer.write(reply.encode('ascii') + b"\n")
+                await writer.drain() # only waits if the client falls behind
+        except (ConnectionError, ValueError): # ValueError: line too long
+            pass
+        finally:
+            writer.close()
+
+async def serve(host='127.0.0.1', port=8765, server=None):
+    """Runs a GameServer on host:port until cancelled"""
+    server = server or GameServer()
+    listener = await asyncio.start_server(server.serve_client, host, port,
+                                          limit=1 << 16)
+    async with listener:
+        await listener.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic-tac-toe game server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    print("Serving tic-tac-toe on {}:{}".format(args.host, args.port))
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Tic-Tac-Toe game rules without any input or output
+# game_session.py
+# Python 3
+
+# GameSession tracks one game being played on a grid: whose turn it is,
+# whether a move is legal and how the game ended. game_server.py and
+# replay.py drive their games through it and do their own I/O; the
+# interactive games (tictactoe.py, tictactoe3.py) still keep their own turn
+# loops.
+
+from engine import new_grid
+
+DRAW = '-' # result of a game nobody won
+
+class IllegalMove(Exception):
+    """A move was made out of turn, off the grid, on a filled cell or after
+    the game ended."""
+
+class GameSession:
+    """One game in progress. O moves first."""
+
+    def __init__(self, rows, cols=None, connects_to_win=None):
+        """Starts a game on a rows x cols grid (square if cols is left out),
+        see Grid for connects_to_win.
+
+        """
+        cols = cols or rows
+        if rows < 2 or cols < 2:
+            raise ValueError("grids must be at least 2x2")
+        self.grid = new_grid(rows, cols, connects_to_win)
+        self.turn = 0
+        self.result = None # 'O', 'X' or DRAW once the game is over
+
+    @property
+    def player(self):
+        """'O' or 'X', whoever moves next"""
+        return 'O' if self.turn % 2 == 0 else 'X'
+
+    def move(self, row, col):
+        """Plays the next player's mark at row, col (indexed from zero).
+        Returns the result ('O', 'X' or DRAW) if the move ended the game, else
+        None. Raises IllegalMove, leaving the game unchanged, if the move
+        can't be played.
+
+        """
+        if self.result:
+            raise IllegalMove("Game is already over.")
+        if not (0 <= row < self.grid.max_row and 0 <= col < self.grid.max_col):
+            raise IllegalMove("Cell is off the grid.")
+        if not self.grid.fill_cell(row, col, self.player):
+            raise IllegalMove("Cell is already occupied.")
+
+        self.turn += 1
+        winner = self.grid.winner()
+        if winner:
+            self.result = winner
+        elif not self.grid.legal_moves():
+            self.result = DRAW
+        return self.result
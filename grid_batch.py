@@ -0,0 +1,85 @@
+# Vectorized winner evaluation for many Tic-Tac-Toe positions at once
+# grid_batch.py
+# Python 3, needs NumPy
+
+# Holds N square boards as one int8 array of shape (N, n, n) using the same
+# signs as Grid's route counters: O is 1, X is -1 and empty cells are 0. A
+# route's sum is then exactly what Grid._victory_routes would hold for it.
+# Summing every row, column and diagonal of every board is one matrix
+# product of a 0/1 route -> cell matrix (2n+2 x n*n) with the flattened boards
+# (n*n x N), and the winners fall out of comparing each board's largest and
+# smallest route sum with +-n, instead of loading each position into a Grid.
+# Routes run along the first axis so those reductions work on whole
+# contiguous rows at a time.
+
+import numpy as np
+
+import victory_routes
+
+_VALUES = {'O': 1, 'X': -1, '-': 0}
+
+_route_matrices = {}
+
+def route_matrix(size):
+    """Returns the float32 (2*size+2, size*size) matrix with a 1 wherever a
+    v-route passes through a row-major cell, cached per grid size. float32
+    keeps the product on the fast BLAS path and is exact for any realistic
+    board.
+
+    """
+    if size not in _route_matrices:
+        matrix = np.zeros((size + size + 2, size * size), dtype=np.float32)
+        for row in range(size):
+            for col in range(size):
+                routes = victory_routes.routes_through(row, col, size)
+                matrix[routes, row * size + col] = 1
+        _route_matrices[size] = matrix
+    return _route_matrices[size]
+
+class GridBatch:
+    """A batch of same-size square positions evaluated together"""
+
+    def __init__(self, boards):
+        """Takes an array-like of shape (N, n, n) holding 1 for O, -1 for X
+        and 0 for empty cells.
+
+        """
+        self.boards = np.asarray(boards, dtype=np.int8)
+        if self.boards.ndim != 3 or \
+                self.boards.shape[1] != self.boards.shape[2]:
+            raise ValueError("boards must have shape (N, n, n)")
+
+    @classmethod
+    def from_grids(cls, grids):
+        """Builds a batch from Grid-like objects (anything with cells)"""
+        return cls([[[_VALUES[xo] for xo in row] for row in grid.cells]
+                    for grid in grids])
+
+    def __len__(self):
+        return len(self.boards)
+
+    def route_sums(self):
+        """Returns an int array of shape (N, 2n+2) holding each board's route
+        sums in v-route order: rows, columns, then the top-left to
+        bottom-right and top-right to bottom-left diagonals.
+
+        """
+        return self._route_sums().T.astype(np.int32)
+
+    def _route_sums(self):
+        # route sums as float32 with shape (2n+2, N), straight from the
+        # matrix product
+        count, n = self.boards.shape[:2]
+        return np.dot(route_matrix(n), self.boards.reshape(count, n * n).T)
+
+    def winners(self):
+        """Returns an int8 array with one entry per board: 1 if O has
+        completed a route, -1 if X has, 0 if neither. Boards where both have
+        (which real games never reach) report O.
+
+        """
+        n = self.boards.shape[1]
+        sums = self._route_sums()
+        o_wins = sums.max(axis=0) >= n
+        x_wins = sums.min(axis=0) <= -n
+        return o_wins.view(np.int8) - (x_wins & ~o_wins).view(np.int8)
@@ -0,0 +1,91 @@
+# Optional counters and timers for the Grid hot paths
+# grid_counters.py
+# Works under both Python 2.7 and Python 3
+
+# GridCounters counts moves, route updates and winner checks made by a grid
+# class (engine.Grid or any class with the same methods), and optionally
+# times them, while it's active:
+#
+#   with GridCounters(engine.Grid) as counters:
+#       ... play games ...
+#   print(counters.report())
+#
+# It works by swapping counting wrappers in for the class's methods on entry
+# and putting the originals back on exit, so when no GridCounters is active
+# the grid runs its ordinary methods and the counters cost nothing at all.
+
+import time
+
+_clock = getattr(time, 'perf_counter', time.time) # not in Python 2
+
+# method -> counter it adds to, one call at a time
+_COUNTED = (('fill_cell', 'moves'), ('undo', 'undos'),
+            ('_log_progress_to_victory', 'progress_updates'),
+            ('_log_run_to_victory', 'run_checks'),
+            ('winner', 'winner_checks'))
+
+class GridCounters(object):
+    """Counts (and with timers=True, times) calls to grid_class's hot paths
+    while active. counts holds calls per counter, plus route_updates (routes
+    touched by progress updates of full-row grids); seconds holds the time
+    spent per counter.
+
+    """
+
+    def __init__(self, grid_class, timers=False):
+        self.grid_class = grid_class
+        self.timers = timers
+        self.counts = dict((name, 0) for method, name in _COUNTED)
+        self.counts['route_updates'] = 0
+        self.seconds = dict((name, 0.0) for method, name in _COUNTED)
+        self._originals = {}
+
+    def __enter__(self):
+        if self._originals:
+            raise RuntimeError("GridCounters is already active")
+        for method, name in _COUNTED:
+            if method in vars(self.grid_class):
+                original = vars(self.grid_class)[method]
+                self._originals[method] = original
+                setattr(self.grid_class, method,
+                        self._wrap(original, name, method))
+        return self
+
+    def __exit__(self, *exc_info):
+        for method, original in self._originals.items():
+            setattr(self.grid_class, method, original)
+        self._originals = {}
+
+    def _wrap(self, original, name, method):
+        # Returns a counting (and maybe timing) stand-in for original
+        counts, seconds = self.counts, self.seconds
+        routes = method == '_log_progress_to_victory'
+
+        def counted(grid, *args, **kwargs):
+            counts[name] += 1
+            if routes and not getattr(grid, '_count_runs', False):
+                # k-in-a-row grids keep no route counters (their moves count
+                # as run_checks instead)
+                counts['route_updates'] += len(
+                    grid._v_routes_through(args[0], args[1]))
+            return original(grid, *args, **kwargs)
+
+        def timed(grid, *args, **kwargs):
+            start = _clock()
+            try:
+                return counted(grid, *args, **kwargs)
+            finally:
+                seconds[name] += _clock() - start
+
+        return timed if self.timers else counted
+
+    def report(self):
+        """Returns the counts (and any timings) as a few lines of text"""
+        lines = []
+        for name in sorted(self.counts):
+            line = "{0:>18} {1:>12}".format(name, self.counts[name])
+            if self.timers and name in self.seconds and self.counts[name]:
+                line += " {0:>10.3f} usec/call".format(
+                    self.seconds[name] / self.counts[name] * 1e6)
+            lines.append(line)
+        return "\n".join(lines)
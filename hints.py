@@ -0,0 +1,210 @@
+# Batched best-move queries for Tic-Tac-Toe
+# hints.py
+# Python 3
+
+# HintService gives the best move and its score for whole batches of
+# positions at a time, e.g. for a hint button used by many players at once or
+# to annotate archived games. Answers are kept in a least recently used cache
+# shared by every call, keyed by the position's canonical form: of the
+# position's 8 reflections and rotations (4 on rectangular grids), written out
+# as strings of cells, the smallest. A position and all of its mirror images
+# therefore share one entry, and the cached move is mapped back through the
+# symmetry. Positions missing from the cache are solved by NegamaxPlayer, once
+# each however often they come up in the batch, in this process or with
+# workers > 1 spread over a pool of processes (each keeping its own
+# transposition table from batch to batch).
+#
+# A position can be given as a grid (any with cells, max_row, max_col and
+# connects_to_win: Grid, BitboardGrid, ...), as Grid.to_bytes() bytes, or as
+# a string of a square full-row grid's cells row by row ('-', 'X' or 'O', so
+# "X---O----" for 3x3). O is taken to have moved first, so the player to move
+# is O when both have made as many moves, else X.
+
+from collections import OrderedDict
+
+from engine import Grid, new_grid
+from negamax_player import NegamaxPlayer, symmetries
+
+_inverses = {}
+
+def _inverse_symmetries(rows, cols):
+    # For each symmetry of a rows x cols grid, the cell mapped onto each cell
+    # (inverses of negamax_player.symmetries), cached per shape
+    if (rows, cols) not in _inverses:
+        inverses = []
+        for perm in symmetries(rows, cols):
+            inverse = [0] * len(perm)
+            for cell_num, image in enumerate(perm):
+                inverse[image] = cell_num
+            inverses.append(inverse)
+        _inverses[rows, cols] = inverses
+    return _inverses[rows, cols]
+
+def read_position(position):
+    """Returns (rows, cols, connects_to_win, cells) for a position given as a
+    grid, Grid.to_bytes() bytes or a string of cells (see the top of the
+    file), cells being a string of '-', 'X' and 'O' row by row
+
+    """
+    if isinstance(position, (bytes, bytearray)):
+        position = Grid.from_bytes(bytes(position))
+    if isinstance(position, str):
+        size = int(round(len(position) ** 0.5))
+        if size < 2 or size * size != len(position) or \
+                position.strip('-XO'):
+            raise ValueError("not the cells of a square grid: {!r}"
+                             .format(position))
+        return size, size, size, position
+    return (position.max_row, position.max_col, position.connects_to_win,
+            ''.join([''.join(row) for row in position.cells]))
+
+def solve(player, rows, cols, connects_to_win, cells, xo):
+    """Returns (cell number, score) of the best move for xo in the position,
+    as found by player (a NegamaxPlayer), or None if the game is over
+
+    """
+    grid = new_grid(rows, cols, None if connects_to_win == rows == cols
+                    else connects_to_win)
+    for cell_num, mark in enumerate(cells):
+        if mark != '-':
+            grid.fill_cell(cell_num // cols, cell_num % cols, mark)
+    if grid.winner() or '-' not in cells:
+        return None
+    (row, col), score = player.analyze(grid, xo)
+    return row * cols + col, score
+
+_players = {} # max_depth -> NegamaxPlayer of a worker process
+
+def _pool_solve(task):
+    # Worker side of HintService: solves one position with this process's
+    # player for the search depth, kept so its transposition table carries
+    # over to the next task
+    max_depth, position = task
+    if max_depth not in _players:
+        _players[max_depth] = NegamaxPlayer(max_depth)
+    return solve(_players[max_depth], *position)
+
+class HintService:
+    """Best moves for batches of positions, with a cache shared by every call
+    and optionally a pool of processes for the positions it misses
+
+    """
+
+    def __init__(self, max_depth=None, cache_size=1 << 16, workers=1):
+        """Arguments:
+        max_depth -- moves searched ahead, as for NegamaxPlayer (None
+        searches to the end of the game, only practical up to 4x4)
+        cache_size -- most positions (up to symmetry) kept in the cache,
+        least recently used ones are dropped beyond that
+        workers -- processes solving cache misses, 1 solves them in this
+        process
+
+        """
+        self.max_depth = max_depth
+        self.cache_size = cache_size
+        self.workers = workers
+        self._cache = OrderedDict()
+        self._player = NegamaxPlayer(max_depth)
+        self._pool = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zeroes the counters reported by stats"""
+        self.queries = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Returns a dict of statistics since the last reset_stats: queries,
+        cache hits and misses (a position asked for more than once in a batch
+        it wasn't cached for is one miss, then hits), hit rate and positions
+        in the cache.
+
+        """
+        return {
+            'queries': self.queries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / self.queries if self.queries else 0.0,
+            'cache_entries': len(self._cache),
+        }
+
+    def clear(self):
+        """Empties the cache"""
+        self._cache.clear()
+
+    def close(self):
+        """Shuts down the worker processes, if any"""
+        if self._pool:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def best_move(self, position):
+        """Returns best_moves' answer for a single position"""
+        return self.best_moves([position])[0]
+
+    def best_moves(self, positions):
+        """Returns a list holding ((row, col), score) of the best move for
+        the player to move in each of positions (an iterable of grids, bytes
+        or cell strings, see the top of the file), or None where the game is
+        already over. Scores are from the mover's point of view, see
+        NegamaxPlayer.analyze. Raises ValueError for a position O and X
+        can't have reached by taking turns.
+
+        """
+        cache = self._cache
+        queries = [] # (key, the symmetry's inverse, cols) per position
+        answers = {} # key -> answer, for the positions of this batch
+        missing = OrderedDict() # key -> position to solve
+        for position in positions:
+            rows, cols, connects_to_win, cells = read_position(position)
+            o_marks, x_marks = cells.count('O'), cells.count('X')
+            if not 0 <= o_marks - x_marks <= 1:
+                raise ValueError("O and X haven't been taking turns: {!r}"
+                                 .format(cells))
+            canonical, inverse = min(
+                (''.join([cells[cell_num] for cell_num in inverse]), inverse)
+                for inverse in _inverse_symmetries(rows, cols))
+            key = (rows, cols, connects_to_win, canonical)
+            queries.append((key, inverse, cols))
+            if key in answers or key in missing:
+                self.hits += 1
+            elif key in cache:
+                cache.move_to_end(key)
+                answers[key] = cache[key]
+                self.hits += 1
+            else:
+                xo = 'O' if o_marks == x_marks else 'X'
+                missing[key] = (rows, cols, connects_to_win, canonical, xo)
+                self.misses += 1
+        self.queries += len(queries)
+
+        for key, answer in zip(missing, self._solve(list(missing.values()))):
+            answers[key] = cache[key] = answer
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False) # least recently used
+        moves = []
+        for key, inverse, cols in queries:
+            if answers[key] is None:
+                moves.append(None)
+            else:
+                cell_num, score = answers[key]
+                moves.append((divmod(inverse[cell_num], cols), score))
+        return moves
+
+    def _solve(self, positions):
+        # Returns the answer for each position, searched here or in the pool
+        if self.workers <= 1 or len(positions) < 2:
+            return [solve(self._player, *position) for position in positions]
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(self.workers)
+        tasks = [(self.max_depth, position) for position in positions]
+        return list(self._pool.map(_pool_solve, tasks, chunksize=max(
+            1, len(tasks) // (4 * self.workers))))
@@ -0,0 +1,153 @@
+# Load generator for the Tic-Tac-Toe game server
+# load_generator.py
+# Python 3
+
+# Plays many random games against game_server.py at once and reports move
+# throughput and move latency (time from sending MOVE to reading its reply).
+# Every game runs as its own asyncio task, spread over a handful of
+# connections with requests pipelined on each, so thousands of games can be
+# in flight without thousands of sockets.
+#
+# Starts its own server in a child process unless --port is given, e.g.:
+#   python3 load_generator.py --games 1000 10000
+#   python3 load_generator.py --port 8765 --games 1000
+
+import argparse
+import asyncio
+import collections
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+class Connection:
+    """A client connection that may have many requests in flight. Replies
+    come back in request order, so each is matched to the oldest waiting
+    request.
+
+    """
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._waiting = collections.deque()
+        self._reading = asyncio.ensure_future(self._read_replies())
+
+    @classmethod
+    async def open(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, line):
+        """Sends one request line and returns its reply line"""
+        reply = asyncio.get_running_loop().create_future()
+        self._waiting.append(reply)
+        self._writer.write(line.encode('ascii') + b"\n")
+        return await reply
+
+    async def _read_replies(self):
+        while True:
+            line = await self._reader.readline()
+            if not line: break
+            self._waiting.popleft().set_result(line.decode('ascii').strip())
+
+    async def close(self):
+        self._writer.close()
+        self._reading.cancel()
+
+async def play_game(connection, size, rng, latencies):
+    """Plays one random game through the server, adding the seconds taken by
+    each MOVE request to latencies. Returns the number of moves made.
+
+    """
+    reply = await connection.request("NEW {}".format(size))
+    game_id = reply.split()[1]
+    cells = [(row, col) for row in range(1, size + 1)
+             for col in range(1, size + 1)]
+    rng.shuffle(cells)
+    moves = 0
+    for row, col in cells:
+        start = time.perf_counter()
+        reply = await connection.request("MOVE {} {} {}".format(
+            game_id, row, col))
+        latencies.append(time.perf_counter() - start)
+        moves += 1
+        if not reply.startswith("OK NEXT"): break
+    await connection.request("END {}".format(game_id))
+    return moves
+
+async def run_load(host, port, games, size, connections, seed):
+    """Plays games concurrent games over connections connections. Returns
+    (moves, seconds, sorted move latencies).
+
+    """
+    rng = random.Random(seed)
+    links = [await Connection.open(host, port) for i in range(connections)]
+    latencies = []
+    start = time.perf_counter()
+    moves = await asyncio.gather(*[
+        play_game(links[i % connections], size,
+                  random.Random(rng.getrandbits(64)), latencies)
+        for i in range(games)])
+    elapsed = time.perf_counter() - start
+    for link in links:
+        await link.close()
+    latencies.sort()
+    return sum(moves), elapsed, latencies
+
+def percentile(ordered, fraction):
+    """Returns the value fraction of the way through an ordered list"""
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def start_server(port):
+    """Starts game_server.py in a child process and waits until it's up"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "game_server.py")
+    server = subprocess.Popen([sys.executable, script, "--port", str(port)],
+                              stdout=subprocess.DEVNULL)
+    for attempt in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port)).close()
+            return server
+        except OSError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError("Game server did not start")
+
+def main():
+    parser = argparse.ArgumentParser(description="Game server load test")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=None,
+                        help="use a running server (default: start one)")
+    parser.add_argument('--games', type=int, nargs='+', default=[1000, 10000],
+                        help="concurrent games per run")
+    parser.add_argument('--size', type=int, default=3)
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = None
+    port = args.port
+    if port is None:
+        port = 8765
+        server = start_server(port)
+    try:
+        print("{:>8} {:>9} {:>10} {:>10} {:>10}".format(
+            "games", "moves", "moves/sec", "p50 ms", "p99 ms"))
+        for games in args.games:
+            moves, elapsed, latencies = asyncio.run(run_load(
+                args.host, port, games, args.size, args.connections,
+                args.seed))
+            print("{:>8} {:>9} {:>10.0f} {:>10.2f} {:>10.2f}".format(
+                games, moves, moves / elapsed,
+                percentile(latencies, 0.5) * 1000,
+                percentile(latencies, 0.99) * 1000))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# Monte Carlo tree search player for Tic-Tac-Toe
+# mcts_player.py
+# Python 3
+
+# For grids too big to search exhaustively. Each playout walks down a tree of
+# the positions seen so far, picking moves by UCT (a move's win rate plus a
+# bonus that grows while it's tried less often than its siblings), adds one
+# new position to the tree, then plays random moves to the end of the game
+# and credits the result to every position on the way. The most visited move
+# at the root is played.
+#
+# Like NegamaxPlayer, playouts make moves on the grid itself with fill_cell
+# and take them all back with undo afterwards, so no board is ever copied;
+# random moves come from the grid's empty-cell index. The tree below the
+# chosen move is kept, and when the player is next asked for a move it picks
+# up from the node for the position the grid has reached, so playouts from
+# earlier turns aren't thrown away.
+#
+# With workers > 1 the search is root-parallel: each worker process searches
+# the position independently and the visit counts of their root moves are
+# added together to choose the move.
+
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+class _Node:
+    """A position in the search tree, reached by move"""
+    __slots__ = ('move', 'xo', 'children', 'untried', 'visits', 'wins')
+
+    def __init__(self, move, xo, untried):
+        self.move = move # (row, col) that led here
+        self.xo = xo # player who made move
+        self.children = []
+        self.untried = untried # legal moves not yet added as children
+        self.visits = 0
+        self.wins = 0.0 # for xo, draws counting a half
+
+class MctsPlayer:
+    """Computer player choosing moves by Monte Carlo tree search (UCT)"""
+
+    def __init__(self, playouts=None, seconds=None, exploration=1.4,
+                 workers=1, seed=0):
+        """Arguments:
+        playouts -- playouts per move (shared out between workers)
+        seconds -- time per move; give playouts, seconds or both (the search
+        stops at whichever runs out first), else 1000 playouts are made
+        exploration -- UCT constant, higher tries more unpromising moves
+        workers -- processes searching in parallel (root parallelization),
+        1 searches in this process and reuses the tree between moves
+        seed -- seeds the random playouts
+
+        """
+        if playouts is None and seconds is None:
+            playouts = 1000
+        if playouts is not None and playouts < 1:
+            raise ValueError("playouts must be at least 1")
+        if seconds is not None and seconds <= 0:
+            raise ValueError("seconds must be more than 0")
+        self.playouts = playouts
+        self.seconds = seconds
+        self.exploration = exploration
+        self.workers = workers
+        self._rng = random.Random(seed)
+        self._pool = None
+        self._root = None
+        self._root_moves = None # grid's move history at the root, for reuse
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zeroes the counters reported by stats"""
+        self.moves = 0
+        self.total_playouts = 0
+        self.reused_playouts = 0
+        self.search_time = 0.0
+
+    def stats(self):
+        """Returns a dict of search statistics since the last reset_stats:
+        moves chosen, playouts made, playouts per second and playouts that
+        came from reusing the tree of an earlier move.
+
+        """
+        return {
+            'moves': self.moves,
+            'playouts': self.total_playouts,
+            'playouts_per_sec': self.total_playouts / self.search_time
+                                if self.search_time else 0.0,
+            'reused_playouts': self.reused_playouts,
+        }
+
+    def close(self):
+        """Shuts down the worker processes, if any"""
+        if self._pool:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def choose_move(self, grid, xo):
+        """Returns the (row, col) of the move for player xo ('X' or 'O') on
+        grid. The grid is searched in place but left as it was. Raises
+        ValueError if the game is already over.
+
+        """
+        if grid.winner() or not grid.legal_moves():
+            raise ValueError("No moves to play, the game is over")
+        start = time.perf_counter()
+        if self.workers > 1:
+            counts, playouts = self._parallel_search(grid, xo)
+        else:
+            root = self._reuse_root(grid, xo)
+            self.reused_playouts += root.visits
+            playouts = search(grid, root, self.playouts, self.seconds,
+                              self.exploration, self._rng)
+            counts = {child.move: child.visits for child in root.children}
+        move = max(counts, key=counts.get)
+
+        if self.workers == 1: # keep the subtree for the next move
+            self._root = next(child for child in root.children
+                              if child.move == move)
+            self._root_moves = grid.move_history() + [move]
+        self.moves += 1
+        self.total_playouts += playouts
+        self.search_time += time.perf_counter() - start
+        return move
+
+    def _reuse_root(self, grid, xo):
+        # Returns the node of the kept tree for grid's position, found by
+        # following the moves made since the tree's root, or a new root
+        root, done = self._root, self._root_moves
+        moves = grid.move_history()
+        if root is not None and moves[:len(done)] == done:
+            for move in moves[len(done):]:
+                root = next((child for child in root.children
+                             if child.move == move), None)
+                if root is None: break
+        else:
+            root = None
+        if root is None or root.xo == xo: # not found, or moves out of turn
+            root = _Node(None, 'X' if xo == 'O' else 'O',
+                         list(grid.legal_moves()))
+        self._root, self._root_moves = None, None
+        return root
+
+    def _parallel_search(self, grid, xo):
+        # Searches grid in every worker, returning the root moves' added up
+        # visit counts and the total number of playouts
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        cells = grid.cells
+        state = (grid.max_row, grid.max_col, grid.connects_to_win,
+                 [(row, col, cells[row][col])
+                  for row, col in grid.move_history()])
+        playouts = self.playouts and -(-self.playouts // self.workers)
+        jobs = [self._pool.submit(_root_search, state, xo, playouts,
+                                  self.seconds, self.exploration,
+                                  self._rng.getrandbits(64))
+                for worker in range(self.workers)]
+        counts = {}
+        total = 0
+        for job in jobs:
+            visits, made = job.result()
+            total += made
+            for move, count in visits:
+                counts[move] = counts.get(move, 0) + count
+        return counts, total
+
+def _root_search(state, xo, playouts, seconds, exploration, seed):
+    # Worker side of a root-parallel search: rebuilds the grid from state and
+    # returns ((move, visits) for each root move, playouts made)
+    from engine import new_grid # only needed in worker processes
+    rows, cols, connects_to_win, moves = state
+    grid = new_grid(rows, cols, connects_to_win)
+    for row, col, mark in moves:
+        grid.fill_cell(row, col, mark)
+    root = _Node(None, 'X' if xo == 'O' else 'O', list(grid.legal_moves()))
+    made = search(grid, root, playouts, seconds, exploration,
+                  random.Random(seed))
+    return [(child.move, child.visits) for child in root.children], made
+
+def search(grid, root, playouts, seconds, exploration, rng):
+    """Runs MCTS playouts from root, the node for grid's current position,
+    until playouts playouts have been made or seconds have passed (either
+    may be None), making at least one whatever the time. Grows the tree
+    under root and returns the playouts made.
+
+    """
+    deadline = time.perf_counter() + seconds if seconds else None
+    fill, undo, winner = grid.fill_cell, grid.undo, grid.winner
+    legal_moves, random_move = grid.legal_moves, grid.random_legal_move
+    log, sqrt = math.log, math.sqrt
+    made = 0
+    while playouts is None or made < playouts:
+        node = root
+        path = [root]
+
+        # selection: descend through fully expanded nodes by UCT
+        while not node.untried and node.children:
+            scale = exploration * sqrt(log(node.visits))
+            best, best_score = None, -1.0
+            for child in node.children:
+                score = (child.wins / child.visits +
+                         scale / sqrt(child.visits))
+                if score > best_score:
+                    best, best_score = child, score
+            node = best
+            fill(node.move[0], node.move[1], node.xo)
+            path.append(node)
+
+        # expansion: add one untried move as a new node
+        if node.untried:
+            untried = node.untried
+            pick = rng.randrange(len(untried))
+            untried[pick], untried[-1] = untried[-1], untried[pick]
+            move = untried.pop()
+            xo = 'X' if node.xo == 'O' else 'O'
+            fill(move[0], move[1], xo)
+            child = _Node(move, xo, [] if winner() else list(legal_moves()))
+            node.children.append(child)
+            node = child
+            path.append(node)
+
+        # playout: random moves until someone wins or the grid fills
+        xo = node.xo
+        played = len(path) - 1
+        while not winner() and legal_moves():
+            xo = 'X' if xo == 'O' else 'O'
+            row, col = random_move(rng)
+            fill(row, col, xo)
+            played += 1
+        result = winner()
+        for i in range(played):
+            undo()
+
+        # backpropagation
+        for node in path:
+            node.visits += 1
+            if result == node.xo:
+                node.wins += 1.0
+            elif not result:
+                node.wins += 0.5
+        made += 1
+        # the clock is read after the first playout and every 16th one on,
+        # so there is always a move to pick however short the time
+        if deadline and made % 16 == 1 and time.perf_counter() >= deadline:
+            break
+    return made
@@ -0,0 +1,185 @@
+# N-dimensional Tic-Tac-Toe grid
+# nd_grid.py
+# Python 3
+
+# Tic-Tac-Toe on an n x n x ... x n board of d dimensions (n ** d cells),
+# e.g. NdGrid(4, 3) for 4x4x4 Qubic; a player wins by filling any straight
+# line of n cells. For d = 2 the lines are exactly the rows, columns and two
+# diagonals of Grid.
+#
+# A line runs in one of the (3 ** d - 1) / 2 directions given by a step of
+# -1, 0 or +1 along each axis (taking only one of each opposite pair), with
+# its cells at 0, 1, ..., n - 1 along the axes stepping +1, n - 1 down to 0
+# along those stepping -1 and fixed anywhere along the rest, which gives
+# ((n + 2) ** d - n ** d) / 2 lines in all. Every line is enumerated once
+# per board shape, with the inverted index from each cell to the lines
+# through it, and both are cached per (n, d) and shared by every NdGrid of
+# that shape, so creating a board only allocates its cells and one counter
+# per line. As with Grid's route counters, each line holds +1 per O and -1
+# per X, and a move only updates the lines through its own cell.
+#
+# Cells are numbered row-major: coords (c0, c1, ..., c(d-1)) is cell
+# c0 * n ** (d-1) + c1 * n ** (d-2) + ... + c(d-1).
+
+import itertools
+
+_indexes = {}
+
+def line_index(size, dimensions):
+    """Returns (lines, lines_through) for a board of size ** dimensions
+    cells, cached per shape: lines is a list holding a tuple of the cell
+    numbers on each line, lines_through a list indexed by cell number holding
+    a tuple of the numbers of the lines through that cell.
+
+    """
+    shape = (size, dimensions)
+    if shape not in _indexes:
+        strides = [size ** (dimensions - 1 - axis)
+                   for axis in range(dimensions)]
+        lines = []
+        for steps in itertools.product((-1, 0, 1), repeat=dimensions):
+            # one of each opposite pair: first non-zero step is +1
+            if next((step for step in steps if step), -1) != 1: continue
+            fixed = [axis for axis, step in enumerate(steps) if not step]
+            for at in itertools.product(range(size), repeat=len(fixed)):
+                base = sum(strides[axis] * where
+                           for axis, where in zip(fixed, at))
+                line = []
+                for t in range(size):
+                    cell_num = base
+                    for axis, step in enumerate(steps):
+                        if step == 1:
+                            cell_num += strides[axis] * t
+                        elif step == -1:
+                            cell_num += strides[axis] * (size - 1 - t)
+                    line.append(cell_num)
+                lines.append(tuple(line))
+        through = [[] for cell_num in range(size ** dimensions)]
+        for x, line in enumerate(lines):
+            for cell_num in line:
+                through[cell_num].append(x)
+        _indexes[shape] = (lines, [tuple(xs) for xs in through])
+    return _indexes[shape]
+
+class NdGrid:
+    """Represents a d-dimensional gameboard, can be called to fill
+    individual cells given by a tuple of coordinates
+
+    """
+
+    def __init__(self, size, dimensions):
+        """Initializes an empty board of size cells along each of dimensions
+        axes (both at least 1)
+
+        """
+        if size < 1 or dimensions < 1:
+            raise ValueError("size and dimensions must be at least 1")
+        self.size = size
+        self.dimensions = dimensions
+        self._lines, self._lines_through = line_index(size, dimensions)
+        self._cells = ['-'] * size ** dimensions
+        self._progress = [0] * len(self._lines) # +1 per O, -1 per X
+        self._winner = False
+        self._moves = [] # cell number of each move, for undo
+        self._winning_move = 0
+
+    def cell_number(self, coords):
+        """Returns the row-major number of the cell at coords, raising
+        IndexError if it's off the board
+
+        """
+        if len(coords) != self.dimensions:
+            raise IndexError("need {} coordinates".format(self.dimensions))
+        cell_num = 0
+        for where in coords:
+            if not 0 <= where < self.size:
+                raise IndexError("cell out of range")
+            cell_num = cell_num * self.size + where
+        return cell_num
+
+    def coords(self, cell_num):
+        """Returns the coordinates of the cell numbered cell_num"""
+        coords = []
+        for axis in range(self.dimensions):
+            cell_num, where = divmod(cell_num, self.size)
+            coords.append(where)
+        return tuple(reversed(coords))
+
+    def cell(self, coords):
+        """Returns '-', 'X' or 'O' for the cell at coords"""
+        return self._cells[self.cell_number(coords)]
+
+    @property
+    def connects_to_win(self):
+        """Marks in a line needed to win, the board's size (read-only)"""
+        return self.size
+
+    def fill_cell(self, coords, xo):
+        """Fills the cell at coords (a tuple of one coordinate per axis, each
+        indexed from zero) with xo ('X' or 'O') if unoccupied, notes progress
+        to victory, and returns true. Returns false if the cell is occupied
+        and does nothing.
+
+        """
+        cell_num = self.cell_number(coords)
+        if self._cells[cell_num] != '-':
+            return False # don't fill already filled spaces
+        if xo == 'O':
+            v_incrementer = 1
+        elif xo == 'X':
+            v_incrementer = -1
+        else:
+            raise ValueError("Needs to take X or O")
+
+        self._cells[cell_num] = xo
+        self._moves.append(cell_num)
+        progress = self._progress
+        for x in self._lines_through[cell_num]:
+            progress[x] += v_incrementer
+            if abs(progress[x]) >= self.size and not self._winner:
+                self._winner = xo
+                self._winning_move = len(self._moves)
+        return True
+
+    def undo(self):
+        """Takes back the most recent move, restoring the board and winner as
+        they were before it, and returns its coordinates. Raises IndexError
+        if there are no moves to take back.
+
+        """
+        cell_num = self._moves.pop()
+        if len(self._moves) < self._winning_move:
+            self._winner, self._winning_move = False, 0
+        v_decrementer = -1 if self._cells[cell_num] == 'O' else 1
+        self._cells[cell_num] = '-'
+        for x in self._lines_through[cell_num]:
+            self._progress[x] += v_decrementer
+        return self.coords(cell_num)
+
+    def move_history(self):
+        """Returns a list of the coordinates of every move still on the
+        board, oldest first, the last being the one undo would take back
+
+        """
+        return [self.coords(cell_num) for cell_num in self._moves]
+
+    def __copy__(self):
+        """Returns an independent copy of the board (copy.copy(board)),
+        sharing only the read-only line index
+
+        """
+        board = NdGrid.__new__(NdGrid)
+        board.__dict__.update(self.__dict__)
+        board._cells = self._cells[:]
+        board._progress = self._progress[:]
+        board._moves = self._moves[:]
+        return board
+
+    def legal_moves(self):
+        """Returns a list of the coordinates of every empty cell"""
+        return [self.coords(cell_num)
+                for cell_num, xo in enumerate(self._cells) if xo == '-']
+
+    def winner(self):
+        """Returns X or O if either player has filled a line, else False"""
+        return self._winner
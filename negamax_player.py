@@ -0,0 +1,268 @@
+# Computer player for Tic-Tac-Toe
+# negamax_player.py
+# Python 3
+
+# Picks moves by negamax search (minimax where each side maximizes its own
+# score) with alpha-beta pruning. Positions already searched are kept in a
+# transposition table keyed by Zobrist hashes: every (player, cell) pair gets
+# a random 64-bit key and a position's hash is the XOR of the keys of its
+# marks, so a move updates the hash with a single XOR. The board's symmetries
+# (8 for square grids, 4 for other rectangles) are folded in by keeping one
+# hash per symmetry, each computed as if the grid had been reflected/rotated,
+# and looking positions up by the smallest -- equivalent positions then share
+# a table entry.
+#
+# Search plays moves on the grid itself with fill_cell and takes them back
+# with undo, so nothing is copied per node. Works with any grid offering
+# fill_cell, winner, undo and cells (Grid, CompactGrid, BitboardGrid).
+# When the search stops at max_depth, grids with evaluate (full-row Grid,
+# BitboardGrid, SparseGrid) score the position by it, squashed into -1 to 1
+# so it ranks between any loss and any win.
+
+import random
+import time
+from collections import OrderedDict
+
+_EXACT, _LOWER, _UPPER = 0, 1, 2 # transposition table bound types
+
+def symmetries(rows, cols):
+    """Returns one list per symmetry of a rows x cols grid, mapping each
+    row-major cell number (row * cols + col) to its image under it. The
+    identity comes first.
+
+    """
+    last_r, last_c = rows - 1, cols - 1
+    transforms = [lambda r, c: (r, c),
+                  lambda r, c: (r, last_c - c), # mirror left-right
+                  lambda r, c: (last_r - r, c), # mirror top-bottom
+                  lambda r, c: (last_r - r, last_c - c)] # rotate 180
+    if rows == cols:
+        transforms += [lambda r, c: (c, r), # mirror about main diagonal
+                       lambda r, c: (c, last_r - r), # rotate 90
+                       lambda r, c: (last_c - c, r), # rotate 270
+                       lambda r, c: (last_c - c, last_r - r)] # anti-diagonal
+
+    perms = []
+    for transform in transforms:
+        perm = []
+        for r in range(rows):
+            for c in range(cols):
+                image_r, image_c = transform(r, c)
+                perm.append(image_r * cols + image_c)
+        perms.append(perm)
+    return perms
+
+class NegamaxPlayer:
+    """Computer player choosing moves by negamax search with alpha-beta
+    pruning and a symmetry-aware transposition table.
+
+    """
+
+    def __init__(self, max_depth=None, table_size=1 << 20, seed=0):
+        """Arguments:
+        max_depth -- moves to look ahead, or None to search to the end of the
+        game (only practical for small grids). Positions at the depth limit
+        are scored by the grid's evaluate, or count as draws on grids
+        without one.
+        table_size -- most positions kept in the transposition table, least
+        recently used ones are dropped beyond that
+        seed -- seeds the Zobrist keys
+
+        """
+        self.max_depth = max_depth
+        self.table_size = table_size
+        self._table = OrderedDict()
+        self._rng = random.Random(seed)
+        self._zobrist = {} # per (rows, cols, connects to win)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zeroes the search counters reported by stats"""
+        self.nodes = 0
+        self.probes = 0
+        self.hits = 0
+        self.search_time = 0.0
+
+    def stats(self):
+        """Returns a dict of search statistics since the last reset_stats:
+        nodes searched, nodes per second and transposition table probes, hits
+        and hit rate.
+
+        """
+        return {
+            'nodes': self.nodes,
+            'nodes_per_sec': self.nodes / self.search_time
+                             if self.search_time else 0.0,
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+            'table_entries': len(self._table),
+        }
+
+    def choose_move(self, grid, xo):
+        """Returns the (row, col) of the best move for player xo ('X' or 'O')
+        on grid. The grid is searched in place but left as it was. Raises
+        ValueError if the grid has no empty cells.
+
+        """
+        return self.analyze(grid, xo)[0]
+
+    def analyze(self, grid, xo):
+        """Returns ((row, col), score) for the best move for player xo on
+        grid, as for choose_move. The score is from xo's point of view: 1 +
+        the cells left empty for a win, as many below 0 for a loss, 0 for a
+        draw, and for no result within max_depth the grid's evaluate mapped
+        to between -1 and 1 (0 without one).
+
+        """
+        start = time.perf_counter()
+        other = 'X' if xo == 'O' else 'O'
+        self._prepare(grid)
+        if not self._remaining:
+            raise ValueError("No empty cells to play")
+        depth = self.max_depth or self._remaining
+
+        # scores run from -(cells + 1) to cells + 1, so these are open bounds
+        best_move, best = None, None
+        alpha, beta = -self._remaining - 2, self._remaining + 2
+        for cell in self._order:
+            if not self._empty[cell]: continue
+            value = self._score_move(cell, xo, other, alpha, beta, depth)
+            if best is None or value > best:
+                best_move, best = cell, value
+                alpha = max(alpha, value)
+
+        self.search_time += time.perf_counter() - start
+        return divmod(best_move, self._cols), best
+
+    def _prepare(self, grid):
+        # Reads the grid into the flat empty-cell flags and per-symmetry
+        # hashes that the search keeps up to date move by move
+        self._grid = grid
+        rows, cols = grid.max_row, grid.max_col
+        self._cols = cols
+        shape = (rows, cols, grid.connects_to_win)
+        if shape not in self._zobrist:
+            self._zobrist[shape] = self._make_keys(rows, cols)
+        self._perms, self._keys, self._side = self._zobrist[shape]
+        self._evaluate = getattr(grid, 'evaluate', None)
+        if self._evaluate is not None:
+            try:
+                self._evaluate('O')
+            except ValueError: # k-in-a-row grids keep no evaluation
+                self._evaluate = None
+
+        # try cells nearest the center first, they tend to be the best moves
+        center_r, center_c = (rows - 1) / 2.0, (cols - 1) / 2.0
+        self._order = sorted(range(rows * cols), key=lambda cell:
+                             abs(cell // cols - center_r) +
+                             abs(cell % cols - center_c))
+
+        self._empty = bytearray(rows * cols)
+        self._hashes = [0] * len(self._perms)
+        self._remaining = 0
+        cells = grid.cells
+        for row in range(rows):
+            for col in range(cols):
+                xo = cells[row][col]
+                if xo == '-':
+                    self._empty[row * cols + col] = 1
+                    self._remaining += 1
+                else:
+                    self._toggle_hashes(row * cols + col, xo)
+
+    def _make_keys(self, rows, cols):
+        # Zobrist keys for a grid shape: the symmetry permutations, a key per
+        # player per cell, and a key per player for the side to move
+        keys = {xo: [self._rng.getrandbits(64) for cell in range(rows * cols)]
+                for xo in 'OX'}
+        side = {xo: self._rng.getrandbits(64) for xo in 'OX'}
+        return symmetries(rows, cols), keys, side
+
+    def _toggle_hashes(self, cell, xo):
+        # XORs a mark in or out of the hash seen from every symmetry
+        keys = self._keys[xo]
+        hashes = self._hashes
+        for s, perm in enumerate(self._perms):
+            hashes[s] ^= keys[perm[cell]]
+
+    def _score_move(self, cell, xo, other, alpha, beta, depth):
+        # Plays xo at cell, scores the result from xo's point of view and
+        # takes the move back. A win scores 1 + the cells left empty, so
+        # quicker wins (and slower losses) are preferred; draws score 0.
+        row, col = divmod(cell, self._cols)
+        self._grid.fill_cell(row, col, xo)
+        self._empty[cell] = 0
+        self._remaining -= 1
+        self._toggle_hashes(cell, xo)
+
+        if self._grid.winner():
+            value = self._remaining + 1
+        elif self._remaining == 0:
+            value = 0
+        elif depth <= 1:
+            value = self._leaf_value(xo)
+        else:
+            value = -self._negamax(other, xo, -beta, -alpha, depth - 1)
+
+        self._toggle_hashes(cell, xo)
+        self._remaining += 1
+        self._empty[cell] = 1
+        self._grid.undo()
+        return value
+
+    def _leaf_value(self, xo):
+        # Scores a position at the depth limit for xo, who just moved: the
+        # grid's evaluation e as e / (|e| + 1), which keeps its order but
+        # stays strictly between a loss (-1 or less) and a win (1 or more)
+        if self._evaluate is None:
+            return 0
+        evaluation = self._evaluate(xo)
+        return evaluation / (abs(evaluation) + 1.0)
+
+    def _negamax(self, xo, other, alpha, beta, depth):
+        # Returns the value of the position for xo, who is to move, searching
+        # depth moves ahead within the alpha-beta window
+        self.nodes += 1
+        table = self._table
+        key = min(self._hashes) ^ self._side[xo]
+        alpha_orig = alpha
+
+        self.probes += 1
+        entry = table.get(key)
+        if entry is not None:
+            table.move_to_end(key)
+            value, bound, entry_depth = entry
+            if entry_depth >= depth:
+                self.hits += 1
+                if bound == _EXACT:
+                    return value
+                elif bound == _LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        best = -self._remaining - 2 # below any real score
+        empty = self._empty
+        for cell in self._order:
+            if not empty[cell]: continue
+            value = self._score_move(cell, xo, other, alpha, beta, depth)
+            if value > best:
+                best = value
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta: break
+
+        if best <= alpha_orig:
+            bound = _UPPER
+        elif best >= beta:
+            bound = _LOWER
+        else:
+            bound = _EXACT
+        table[key] = (best, bound, depth)
+        table.move_to_end(key)
+        if len(table) > self.table_size:
+            table.popitem(last=False) # least recently used
+        return best
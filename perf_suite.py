@@ -0,0 +1,280 @@
+# Benchmark suite for the Tic-Tac-Toe engine and fizzbuzz
+# perf_suite.py
+# Works under both Python 2.7 and Python 3
+
+# Times the engine's hot paths (fill_cell, _log_progress_to_victory, winner,
+# print_game) across board sizes, and the fizzbuzz generator, and writes the
+# results as JSON so runs can be kept and compared. The grid is timed under
+# whichever Python runs the suite, and print_game through the front-end for
+# it: tictactoe.py under Python 2, tictactoe3.py under Python 3.
+#
+# Every benchmark is a sample function that sets up its own state, times
+# just the operations being measured and returns (seconds, operations).
+# Samples are taken until each of --repeat runs has lasted at least
+# --min-time seconds (timeit style), and the per-operation times of the runs
+# are reported with their minimum and median.
+#
+# Run with:
+#   python3 perf_suite.py -o new.json        (python2 for tictactoe.py)
+#   python3 perf_suite.py --compare old.json new.json
+# --compare flags every benchmark whose median got slower by more than
+# --threshold (10% by default) and exits with status 1 if there are any.
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import fizzbuzz
+from bench_helpers import random_cells
+from engine import Grid
+from grid_counters import GridCounters
+
+if sys.version_info[0] == 2:
+    import tictactoe as front_end
+else:
+    import tictactoe3 as front_end
+
+_clock = getattr(time, 'perf_counter', time.time) # not in Python 2
+
+SIZES = (3, 15, 101, 1001)
+PRINT_SIZES = (3, 15, 101)
+
+def fill_cell_sample(n, moves=2000):
+    """Sample function timing fill_cell on a fresh n x n Grid"""
+    cells = random_cells(n, moves)
+    def sample():
+        grid = Grid(n, n)
+        start = _clock()
+        for turn, (row, col) in enumerate(cells):
+            grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+        return _clock() - start, len(cells)
+    return sample
+
+def log_progress_sample(n, moves=2000):
+    """Sample function timing _log_progress_to_victory alone (the route
+    counter updates of fill_cell) on a fresh n x n Grid
+
+    """
+    cells = random_cells(n, moves)
+    def sample():
+        grid = Grid(n, n)
+        log_progress = grid._log_progress_to_victory
+        start = _clock()
+        for turn, (row, col) in enumerate(cells):
+            log_progress(row, col, 'O' if turn % 2 == 0 else 'X')
+        return _clock() - start, len(cells)
+    return sample
+
+def winner_sample(n, calls=10000):
+    """Sample function timing winner() on a half filled n x n Grid"""
+    grid = Grid(n, n)
+    for turn, (row, col) in enumerate(random_cells(n, min(n * n // 2, 2000))):
+        grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+    def sample():
+        winner = grid.winner
+        start = _clock()
+        for i in range(calls):
+            winner()
+        return _clock() - start, calls
+    return sample
+
+class _Interface(front_end.__dict__.get('GameInterface', object)):
+    # tictactoe.GameInterface without its interactive menu
+    def __init__(self, grid):
+        self.game = grid
+
+def print_game_sample(n, frames=10):
+    """Sample function timing print_game of a half filled n x n grid, with
+    stdout sent to os.devnull
+
+    """
+    grid = Grid(n, n)
+    for turn, (row, col) in enumerate(random_cells(n, n * n // 2)):
+        grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+    if hasattr(front_end, 'GameInterface'):
+        print_game = _Interface(grid).print_game
+    else:
+        print_game = lambda: front_end.print_game(grid)
+    def sample():
+        with open(os.devnull, 'w') as out:
+            stdout, sys.stdout = sys.stdout, out
+            try:
+                start = _clock()
+                for frame in range(frames):
+                    print_game()
+                elapsed = _clock() - start
+            finally:
+                sys.stdout = stdout
+        return elapsed, frames
+    return sample
+
+def fizzbuzz_sample(maximum=100000):
+    """Sample function timing the fizzbuzz generator, per number"""
+    def sample():
+        start = _clock()
+        for x in fizzbuzz.fizzbuzz(maximum):
+            pass
+        return _clock() - start, maximum
+    return sample
+
+def fizzbuzz_chunks_sample(maximum=1000000):
+    """Sample function timing fizzbuzz_chunks, per number"""
+    def sample():
+        start = _clock()
+        for chunk in fizzbuzz.fizzbuzz_chunks(maximum):
+            pass
+        return _clock() - start, maximum
+    return sample
+
+def benchmarks():
+    """Returns a list of (name, sample function factory) for the suite"""
+    suite = []
+    for n in SIZES:
+        suite.append(("fill_cell/{0}".format(n),
+                      lambda n=n: fill_cell_sample(n)))
+        suite.append(("log_progress_to_victory/{0}".format(n),
+                      lambda n=n: log_progress_sample(n)))
+        suite.append(("winner/{0}".format(n), lambda n=n: winner_sample(n)))
+    for n in PRINT_SIZES:
+        suite.append(("print_game/{0}".format(n),
+                      lambda n=n: print_game_sample(n)))
+    suite.append(("fizzbuzz/generator", fizzbuzz_sample))
+    suite.append(("fizzbuzz/chunks", fizzbuzz_chunks_sample))
+    return suite
+
+def measure(sample, repeat, min_time):
+    """Returns repeat per-operation times in seconds, each from samples
+    taken until they add up to at least min_time
+
+    """
+    sample() # warm up: caches, lazily built tables
+    times = []
+    for run in range(repeat):
+        seconds = operations = 0
+        while seconds < min_time:
+            elapsed, count = sample()
+            seconds += elapsed
+            operations += count
+        times.append(seconds / operations)
+    return times
+
+def median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2.0
+
+def count_game_paths(games=100, n=15, seed=0):
+    """Plays games random games on n x n Grids with GridCounters active and
+    returns its counts
+
+    """
+    rng = random.Random(seed)
+    with GridCounters(Grid) as counters:
+        for game in range(games):
+            grid = Grid(n, n)
+            for turn, (row, col) in enumerate(
+                    random_cells(n, n * n, rng.random())):
+                grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+                if grid.winner(): break
+    return counters.counts
+
+def run_suite(repeat=5, min_time=0.05, only=None, counters=False,
+              out=sys.stderr):
+    """Runs the benchmarks (those whose names contain only, if given) and
+    returns the results as a dict ready for JSON, reporting progress to out
+
+    """
+    results = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'front_end': front_end.__name__,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'unit': 'seconds per operation',
+        'benchmarks': {},
+    }
+    for name, factory in benchmarks():
+        if only and only not in name: continue
+        times = measure(factory(), repeat, min_time)
+        results['benchmarks'][name] = {
+            'times': times, 'min': min(times), 'median': median(times)}
+        out.write("{0:<32} {1:>12.3f} usec\n".format(
+            name, median(times) * 1e6))
+    if counters:
+        results['counters'] = count_game_paths()
+    return results
+
+def compare(old, new, threshold=0.1, out=sys.stdout):
+    """Prints the change in median time of every benchmark in both result
+    dicts, flagging those slower by more than threshold (a fraction).
+    Returns the names of the regressions.
+
+    """
+    if old.get('front_end') != new.get('front_end') or \
+            old.get('python') != new.get('python'):
+        out.write("note: comparing {0} on Python {1} with {2} on Python {3}\n"
+                  .format(old.get('front_end'), old.get('python'),
+                          new.get('front_end'), new.get('python')))
+    regressions = []
+    out.write("{0:<32} {1:>12} {2:>12} {3:>8}\n".format(
+        "benchmark", "old usec", "new usec", "change"))
+    for name in sorted(set(old['benchmarks']) & set(new['benchmarks'])):
+        before = old['benchmarks'][name]['median']
+        after = new['benchmarks'][name]['median']
+        change = after / before - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        out.write("{0:<32} {1:>12.3f} {2:>12.3f} {3:>+7.1%}{4}\n".format(
+            name, before * 1e6, after * 1e6, change, flag))
+    for name in sorted(set(old['benchmarks']) ^ set(new['benchmarks'])):
+        out.write("{0:<32} only in {1} run\n".format(
+            name, "old" if name in old['benchmarks'] else "new"))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine benchmark suite")
+    parser.add_argument('-o', '--output', help="write results to this file "
+                        "(default: stdout)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help="seconds per repeat (default 0.05)")
+    parser.add_argument('--only', help="run benchmarks whose names contain "
+                        "this")
+    parser.add_argument('--counters', action='store_true',
+                        help="also record GridCounters counts for a set of "
+                             "random games")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help="compare two result files instead of running")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="slowdown flagged as a regression (default "
+                             "0.1, i.e. 10%%)")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as old, open(args.compare[1]) as new:
+            regressions = compare(json.load(old), json.load(new),
+                                  args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    results = run_suite(args.repeat, args.min_time, args.only, args.counters)
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as out:
+            out.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Non-interactive replay of recorded Tic-Tac-Toe games
+# replay.py
+# Python 3
+
+# Reads game transcripts, one game per line, plays each through the game
+# rules without any prompts and writes one result line per game as soon as
+# it's played. Input is read and processed a line at a time by a chain of
+# generators, so memory use doesn't grow with the input.
+#
+# Transcript lines look like:
+#   3 1,1 2,1 1,2 2,2 1,3
+#   15/5 8,8 8,9 7,7 ...
+# the grid size (optionally /marks in a row to win), then each move as
+# row,col numbered from 1, players alternating starting with O. Blank lines
+# and lines starting with # are skipped.
+#
+# Result lines give the transcript's line number, then one of:
+#   WIN <O|X> <move>            -- who won, and on which move
+#   DRAW <move>                 -- grid filled with no winner
+#   UNFINISHED <moves>          -- moves ran out before the game ended
+#   ILLEGAL <move> <message>    -- a move couldn't be played (replay stops)
+#   ERROR <message>             -- the line couldn't be read
+#
+# Run with: python3 tictactoe3.py --replay [FILE]   (stdin if no FILE)
+
+import sys
+
+from game_session import DRAW, GameSession, IllegalMove
+
+class TranscriptError(Exception):
+    """A transcript line couldn't be parsed."""
+
+def parse_transcript(line):
+    """Returns (size, connects_to_win, moves) for one transcript line, where
+    moves is a generator of zero-indexed (row, col) pairs. Raises
+    TranscriptError if the grid size can't be read (bad moves are reported
+    as the generator reaches them).
+
+    """
+    words = line.split()
+    size, _, connects = words[0].partition('/')
+    try:
+        size = int(size)
+        connects_to_win = int(connects) if connects else None
+    except ValueError:
+        raise TranscriptError("Bad grid size {}".format(words[0]))
+    return size, connects_to_win, _parse_moves(words[1:])
+
+def _parse_moves(words):
+    for word in words:
+        row, _, col = word.partition(',')
+        try:
+            yield int(row) - 1, int(col) - 1
+        except ValueError:
+            raise TranscriptError("Bad move {}".format(word))
+
+def read_transcripts(lines):
+    """Generator of (line number, transcript line) for each game in lines,
+    skipping blank lines and comments
+
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield number, line
+
+def play_transcript(line):
+    """Plays one transcript line, returning its result line (without the
+    line number or newline)
+
+    """
+    try:
+        size, connects_to_win, moves = parse_transcript(line)
+        game = GameSession(size, size, connects_to_win)
+        for played, (row, col) in enumerate(moves, 1):
+            try:
+                game.move(row, col)
+            except IllegalMove as e: # including moves after the game ended
+                return "ILLEGAL {} {}".format(played, e)
+    except (TranscriptError, ValueError) as e:
+        return "ERROR {}".format(e)
+
+    if game.result == DRAW:
+        return "DRAW {}".format(game.turn)
+    elif game.result:
+        return "WIN {} {}".format(game.result, game.turn)
+    return "UNFINISHED {}".format(game.turn)
+
+def replay(lines, out):
+    """Plays every transcript in lines, writing result lines to out as it
+    goes. Returns the number of games played.
+
+    """
+    games = 0
+    for number, line in read_transcripts(lines):
+        out.write("{} {}\n".format(number, play_transcript(line)))
+        games += 1
+    return games
+
+def main(args):
+    """Replays the file named in args, or stdin if none"""
+    if len(args) > 1:
+        sys.exit("usage: python3 tictactoe3.py --replay [FILE]")
+    if args:
+        with open(args[0]) as lines:
+            replay(lines, sys.stdout)
+    else:
+        replay(sys.stdin, sys.stdout)
@@ -0,0 +1,141 @@
+# Batch self-play simulation for Tic-Tac-Toe
+# simulate.py
+# Python 3
+
+# Plays large numbers of games between computer players across a pool of
+# worker processes and tallies who wins, per board size and opening move.
+# Workers are only sent a seed and the game settings; each plays a whole chunk
+# of games and sends back a few (opening, outcome, count) tuples, so neither
+# boards nor per-game results cross process boundaries.
+#
+# Run with e.g.: python3 simulate.py --sizes 3 4 5 --games 1000000
+
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from negamax_player import NegamaxPlayer
+from engine import new_grid
+
+PLAYERS = ('random', 'negamax')
+DRAW = '-' # outcome of a game nobody won
+
+def play_games(size, connects_to_win, players, seed, games):
+    """Plays games games on size x size grids and returns a tuple of
+    (opening cell, outcome, count) tuples, where outcome is 'O', 'X' or DRAW
+    and the opening cell is the row-major number of O's first move.
+
+    Arguments:
+    size -- grid size
+    connects_to_win -- marks in a row needed to win, None for a full row
+    players -- pair of player kinds (from PLAYERS) for O and X
+    seed -- seeds the random players, so a chunk can be replayed exactly
+    games -- number of games to play
+
+    """
+    rng = random.Random(seed)
+    searchers = {}
+    for xo, kind in zip('OX', players):
+        if kind not in PLAYERS:
+            raise ValueError("Unknown player {}".format(kind))
+        if kind == 'negamax': # shared across games so its table stays warm
+            searchers[xo] = NegamaxPlayer(None if size <= 4 else 2)
+
+    tally = Counter()
+    for game in range(games):
+        grid = new_grid(size, size, connects_to_win)
+        opening = None
+        outcome = DRAW
+        for turn in range(size * size):
+            xo = 'O' if turn % 2 == 0 else 'X'
+            if xo in searchers and turn > 0: # random openings, for the stats
+                row, col = searchers[xo].choose_move(grid, xo)
+            else:
+                row, col = grid.random_legal_move(rng)
+            grid.fill_cell(row, col, xo)
+            if opening is None:
+                opening = row * size + col
+            if grid.winner():
+                outcome = grid.winner()
+                break
+        tally[opening, outcome] += 1
+    return tuple((opening, outcome, count)
+                 for (opening, outcome), count in tally.items())
+
+def simulate(sizes, games, connects_to_win=None,
+             players=('random', 'random'), workers=None, chunk_size=10000,
+             seed=0):
+    """Plays games games for each grid size across workers processes (all
+    cores by default; 1 plays in this process). Returns (results, seconds)
+    where results maps each size to a Counter of (opening, outcome) pairs.
+
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = []
+    for size in sizes:
+        for start in range(0, games, chunk_size):
+            jobs.append((size, connects_to_win, tuple(players),
+                         seed + len(jobs), min(chunk_size, games - start)))
+
+    results = {size: Counter() for size in sizes}
+    begin = time.perf_counter()
+    if workers == 1:
+        for job in jobs:
+            _add_results(results[job[0]], play_games(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(play_games, *job): job[0] for job in jobs}
+            for future in as_completed(futures):
+                _add_results(results[futures[future]], future.result())
+    return results, time.perf_counter() - begin
+
+def _add_results(tally, chunk):
+    # Folds a chunk of (opening, outcome, count) tuples into a Counter
+    for opening, outcome, count in chunk:
+        tally[opening, outcome] += count
+
+def report(results, seconds):
+    """Prints win/draw rates per grid size and opening move, and games/sec"""
+    total = 0
+    for size in sorted(results):
+        tally = results[size]
+        games = sum(tally.values())
+        total += games
+        print("{0}x{0}: {1} games".format(size, games))
+        print("{:>10} {:>8} {:>8} {:>8} {:>8}".format(
+            "opening", "games", "O wins", "X wins", "draws"))
+        for opening in sorted(set(opening for opening, outcome in tally)):
+            counts = [tally[opening, outcome] for outcome in ('O', 'X', DRAW)]
+            played = sum(counts)
+            row, col = divmod(opening, size)
+            print("{:>10} {:>8} {:>7.1%} {:>7.1%} {:>7.1%}".format(
+                "({}, {})".format(row + 1, col + 1), played,
+                *[count / played for count in counts]))
+    print("{} games in {:.2f}s ({:.0f} games/sec)".format(
+        total, seconds, total / seconds))
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic-tac-toe self-play")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3])
+    parser.add_argument('--games', type=int, default=100000,
+                        help="games per grid size")
+    parser.add_argument('--connects', type=int, default=None,
+                        help="marks in a row to win (default a full row)")
+    parser.add_argument('--players', nargs=2, choices=PLAYERS,
+                        default=['random', 'random'], help="kinds of O and X")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes to use (default all cores)")
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    results, seconds = simulate(args.sizes, args.games, args.connects,
+                                args.players, args.workers, args.chunk_size,
+                                args.seed)
+    report(results, seconds)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# Solved-position database for small Tic-Tac-Toe grids
+# solved_positions.py
+# Python 3
+
+# Walks the whole game tree of a size x size grid (practical for 3x3 and
+# 4x4), works out the game-theoretic value of every reachable position and
+# stores it on disk, so the computer player or a hint feature can look a
+# position up instead of searching.
+#
+# Positions are numbered in base 3, one digit per row-major cell (0 empty,
+# 1 O, 2 X). Of the (up to 8) positions equivalent under the grid's
+# symmetries only the one with the smallest number is stored; positions keep
+# a number per symmetry, updated by one addition per move, so that smallest
+# number is cheap to find.
+#
+# Only the stored positions take space in the file: the numbers are split
+# into blocks of 256, and an offset table gives the index of the first
+# stored position of each block. Each stored position then has a byte for
+# its number's last 8 bits and a byte for its value, all in number order
+# (3MB for 4x4, where a byte for every one of the 3 ** 16 numbers would take
+# 43MB). A lookup from the memory-mapped file reads the block's two offsets
+# and searches the few low bytes between them for the number's, so it costs
+# the same whatever the table's size and never reads the whole table.
+#
+# Building still marks positions solved in a table holding a byte per
+# number, but only in memory, and it is dropped once the file is written.
+#
+# Values use NegamaxPlayer's scoring, from the point of view of the player
+# to move: 1 + the cells left empty when they can force a win, the negative
+# of that when they will lose, 0 for a draw.
+#
+# Build with: python3 solved_positions.py 4 ttt4.solved
+
+import mmap
+import struct
+import sys
+import time
+from array import array
+
+from bitboard import BitboardGrid
+from negamax_player import symmetries
+
+MAGIC = b'TTTSOLB'
+# the file starts with MAGIC, the grid size and the number of positions
+# stored, followed by the offset table (a uint32 per block, and one more
+# for the end), then the low bytes and the values of the stored positions
+_HEADER = struct.Struct('<7sBI')
+_BLOCK = struct.Struct('<2I') # a block's first offset and the next one's
+HEADER_SIZE = _HEADER.size
+MAX_SIZE = 4 # bigger grids have far too many positions to solve
+_LOW_BYTES = [bytes([low]) for low in range(256)]
+_OFFSET = 64 # stored byte is value + _OFFSET; 0 means not yet solved
+
+def table_size(size):
+    """Returns the bytes of the table enumerate_positions needs for a size x
+    size grid, one per position number
+
+    """
+    return 3 ** (size * size)
+
+def _blocks(size):
+    # Returns the number of 256 position number blocks for the grid size
+    return (table_size(size) >> 8) + 1
+
+def enumerate_positions(size, table):
+    """Generator walking every position reachable from the empty size x size
+    grid, depth first, yielding (number, value) once for each set of
+    symmetric positions as it is solved. The empty grid comes last.
+
+    Arguments:
+    size -- grid size
+    table -- zeroed writable buffer of table_size(size) bytes, where solved
+    values are recorded (and looked up again when a position recurs), so
+    memory use is the table plus one path through the tree
+
+    """
+    grid = BitboardGrid(size, size)
+    powers = [3 ** cell for cell in range(size * size)]
+    perms = symmetries(size, size)
+    # images[cell] holds 3 ** (cell's image) under each symmetry
+    images = [[powers[perm[cell]] for perm in perms]
+              for cell in range(size * size)]
+    return _solve(grid, 'O', 'X', [0] * len(perms), size * size, images,
+                  table)
+
+def _solve(grid, xo, other, numbers, empties, images, table):
+    # Solves the position on grid (xo to move, numbers holding its number
+    # under each symmetry) by solving every move from it, yielding each
+    # newly solved position and returning the position's value
+    digit = 1 if xo == 'O' else 2
+    best = None
+    for cell in range(len(images)):
+        row, col = divmod(cell, grid.max_col)
+        if not grid.fill_cell(row, col, xo): continue
+        child = [number + digit * image
+                 for number, image in zip(numbers, images[cell])]
+        key = min(child)
+        if table[key]:
+            value = table[key] - _OFFSET
+        else:
+            if grid.winner(): # xo just won, other is to move and has lost
+                value = -empties
+            elif empties == 1: # grid full, draw
+                value = 0
+            else:
+                value = yield from _solve(grid, other, xo, child, empties - 1,
+                                          images, table)
+            if not table[key]:
+                table[key] = value + _OFFSET
+                yield key, value
+        grid.undo()
+        if best is None or -value > best:
+            best = -value
+
+    key = min(numbers)
+    table[key] = best + _OFFSET
+    yield key, best
+    return best
+
+def build(size, path, progress_every=100000, out=sys.stderr):
+    """Solves every position of a size x size grid into a table file at path,
+    reporting progress (positions solved and positions/sec) to out. Returns
+    the number of positions stored. Needs table_size(size) bytes of memory
+    while solving, 43MB for 4x4. Raises ValueError for grids over MAX_SIZE.
+
+    """
+    if not 2 <= size <= MAX_SIZE:
+        raise ValueError("tables are built for 2x2 up to {0}x{0} grids"
+                         .format(MAX_SIZE))
+    start = time.perf_counter()
+    keys, values = array('I'), bytearray()
+    solved = 0
+    for solved, (key, value) in enumerate(
+            enumerate_positions(size, bytearray(table_size(size))), 1):
+        keys.append(key)
+        values.append(value + _OFFSET)
+        if progress_every and solved % progress_every == 0:
+            elapsed = time.perf_counter() - start
+            out.write("{} positions, {:.0f} positions/sec\n".format(
+                solved, solved / elapsed))
+    order = sorted(range(solved), key=keys.__getitem__)
+    offsets = array('I', bytes(4 * (_blocks(size) + 1)))
+    for key in keys:
+        offsets[(key >> 8) + 1] += 1
+    for block in range(1, len(offsets)): # counts per block -> offsets
+        offsets[block] += offsets[block - 1]
+    if sys.byteorder == 'big': # always stored little-endian
+        offsets.byteswap()
+    with open(path, 'wb') as table_file:
+        table_file.write(_HEADER.pack(MAGIC, size, solved))
+        table_file.write(offsets.tobytes())
+        table_file.write(bytes([keys[i] & 0xff for i in order]))
+        table_file.write(bytes([values[i] for i in order]))
+    elapsed = time.perf_counter() - start
+    out.write("done: {} positions in {:.1f}s ({:.0f} positions/sec)\n".format(
+        solved, elapsed, solved / elapsed))
+    return solved
+
+class SolvedTable:
+    """Read-only, memory-mapped view of a table written by build"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as table_file:
+            self._mapped = mmap.mmap(table_file.fileno(), 0,
+                                     access=mmap.ACCESS_READ)
+        if self._mapped[:len(MAGIC)] != MAGIC:
+            raise ValueError("{} is not a solved position table".format(path))
+        magic, self.size, count = _HEADER.unpack_from(self._mapped)
+        self._lows = HEADER_SIZE + 4 * (_blocks(self.size) + 1)
+        self._values = self._lows + count # where each part starts
+        if len(self._mapped) != self._values + count:
+            raise ValueError("{} is truncated".format(path))
+        self._images = [[3 ** perm[cell] for perm in
+                         symmetries(self.size, self.size)]
+                        for cell in range(self.size * self.size)]
+
+    def close(self):
+        self._mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _numbers(self, grid):
+        # Returns the grid's position number under each symmetry and the
+        # player to move, or None for the player if the mark counts can't
+        # come from a real game
+        if grid.max_row != self.size or grid.max_col != self.size:
+            raise ValueError("table is for {0}x{0} grids".format(self.size))
+        numbers = [0] * len(self._images[0])
+        marks = {'O': 0, 'X': 0, '-': 0}
+        for row, cells in enumerate(grid.cells):
+            for col, xo in enumerate(cells):
+                marks[xo] += 1
+                if xo != '-':
+                    digit = 1 if xo == 'O' else 2
+                    for s, image in enumerate(
+                            self._images[row * self.size + col]):
+                        numbers[s] += digit * image
+        if marks['O'] == marks['X']:
+            return numbers, 'O'
+        elif marks['O'] == marks['X'] + 1:
+            return numbers, 'X'
+        return numbers, None
+
+    def _lookup(self, numbers):
+        # Returns the value stored for the smallest of numbers, or None if it
+        # isn't stored: the low bytes of its block are searched for its own
+        key = min(numbers)
+        mapped = self._mapped
+        first, end = _BLOCK.unpack_from(mapped, HEADER_SIZE + 4 * (key >> 8))
+        found = mapped.find(_LOW_BYTES[key & 0xff], self._lows + first,
+                            self._lows + end)
+        return mapped[found + self._values - self._lows] - _OFFSET \
+            if found >= 0 else None
+
+    def value(self, grid):
+        """Returns the value of grid's position for the player to move (see
+        above), or None if the position can't be reached in a real game.
+
+        """
+        numbers, xo = self._numbers(grid)
+        return self._lookup(numbers) if xo else None
+
+    def best_move(self, grid):
+        """Returns ((row, col), value) for the best move of the player to
+        move, the value being theirs after making it, or None if the game is
+        over or the position can't be reached.
+
+        """
+        numbers, xo = self._numbers(grid)
+        if not xo or grid.winner(): return None
+        digit = 1 if xo == 'O' else 2
+        best = None
+        cells = grid.cells
+        for cell, images in enumerate(self._images):
+            row, col = divmod(cell, self.size)
+            if cells[row][col] != '-': continue
+            child = self._lookup([number + digit * image
+                                  for number, image in zip(numbers, images)])
+            if child is not None and (best is None or -child > best[1]):
+                best = ((row, col), -child)
+        return best
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("usage: python3 solved_positions.py SIZE TABLE_FILE")
+    build(int(sys.argv[1]), sys.argv[2])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+# Sparse Tic-Tac-Toe grid for huge or unbounded boards
+# sparse_grid.py
+# Python 3
+
+# Same interface as engine.Grid (fill_cell, undo, winner, legal_moves,
+# random_legal_move, cells, max_row, max_col), but nothing is allocated per
+# cell or per route up front: only the occupied cells are stored, in a dict
+# keyed by (row, col), and in full-row mode only the routes to victory that
+# hold a mark get a counter (a route whose count drops back to 0 is
+# dropped). Memory is proportional to the moves played, whatever the board
+# size, so a 100000 x 100000 game costs no more than a 15 x 15 one.
+#
+# Leaving out the size (SparseGrid(connects_to_win=5)) gives an infinite
+# board for k-in-a-row, where any int coordinates, negative ones included,
+# can be played.
+
+import struct
+import sys
+from array import array
+
+import victory_routes
+
+MAGIC = b'TTTS' # starts SparseGrid.to_bytes, unlike Grid.to_bytes
+
+class _EmptyCells:
+    """Live view of the empty cells of a bounded SparseGrid, giving
+    (row, col) for each, like Grid.legal_moves. Iterating walks the whole
+    board, so it's only sensible for boards of ordinary size.
+
+    """
+    __slots__ = ('_grid',)
+
+    def __init__(self, grid):
+        self._grid = grid
+
+    def __len__(self):
+        grid = self._grid
+        return grid.max_row * grid.max_col - len(grid._marks)
+
+    def __iter__(self):
+        grid = self._grid
+        for row in range(grid.max_row):
+            for col in range(grid.max_col):
+                if (row, col) not in grid._marks:
+                    yield row, col
+
+    def __contains__(self, row_col):
+        row, col = row_col
+        grid = self._grid
+        return (0 <= row < grid.max_row and 0 <= col < grid.max_col and
+                (row, col) not in grid._marks)
+
+class SparseGrid:
+    """Represents gameboard by its occupied cells only, can be called to fill
+    individual cells. Drop-in for engine.Grid on boards too big to
+    allocate, and for infinite k-in-a-row boards.
+
+    """
+
+    def __init__(self, rows=None, cols=None, connects_to_win=None):
+        """Arguments:
+        rows, cols -- size of the grid, or both None for an infinite board
+        (max_row and max_col are then None)
+        connects_to_win -- marks in a row needed to win, as for Grid: a full
+        row by default, which needs a square grid. Required on an infinite
+        board.
+
+        """
+        self.max_row = rows
+        self.max_col = cols
+        self._marks = {} # (row, col) -> 'X' or 'O', occupied cells only
+        self._routes = {} # v-route -> progress, as Grid._victory_routes
+        self._moves = [] # (row, col) of each move, for undo
+        self._winner = False
+        self._winning_move = 0
+        if (rows is None) != (cols is None):
+            raise ValueError("give both rows and cols, or neither")
+        if rows is None:
+            if connects_to_win is None or connects_to_win < 2:
+                raise ValueError("an infinite grid needs connects_to_win of "
+                                 "at least 2")
+            self._connects_to_win = connects_to_win
+            self._count_runs = True
+        elif connects_to_win is None or connects_to_win == rows == cols:
+            if rows != cols: raise ValueError("rows and cols must be equal")
+            self._connects_to_win = rows
+            self._count_runs = False
+        else:
+            if not 1 < connects_to_win <= max(rows, cols):
+                raise ValueError("connects_to_win must be from 2 up to the "
+                                 "longest side of the grid")
+            self._connects_to_win = connects_to_win
+            self._count_runs = True
+
+    @property
+    def cells(self):
+        """List of rows holding '-', 'X' or 'O' for each cell, built from the
+        occupied cells (a snapshot; changing it does not change the grid).
+        Costs rows * cols, so avoid it on huge boards. Raises ValueError on an
+        infinite board.
+
+        """
+        if self.max_row is None:
+            raise ValueError("an infinite grid can't be listed")
+        cells = [['-'] * self.max_col for row in range(self.max_row)]
+        for (row, col), xo in self._marks.items():
+            cells[row][col] = xo
+        return cells
+
+    def cell(self, row, col):
+        """Returns '-', 'X' or 'O' for one cell"""
+        return self._marks.get((row, col), '-')
+
+    @property
+    def connects_to_win(self):
+        """Marks in a row needed to win (read-only)"""
+        return self._connects_to_win
+
+    def fill_cell(self, row, col, xo):
+        """Fills specified cell if unoccupied, notes progress to victory
+        conditions, and return true. Returns false if cell occupied and does
+        nothing.
+
+        Arguments:
+        row -- grid row (indexed from zero; any int on an infinite board)
+        col -- grid column (same as row)
+        xo -- 'X' or 'O' character to specify player
+
+        """
+        if self.max_row is not None and not (0 <= row < self.max_row and
+                                             0 <= col < self.max_col):
+            raise IndexError("cell out of range")
+        if (row, col) in self._marks:
+            return False # don't fill already filled spaces
+        if xo not in ('X', 'O'):
+            raise ValueError("Needs to take X or O")
+
+        self._marks[row, col] = xo
+        self._moves.append((row, col))
+        if self._count_runs:
+            self._log_run_to_victory(row, col, xo)
+        else:
+            self._log_progress_to_victory(row, col, 1 if xo == 'O' else -1)
+        if self._winner and not self._winning_move:
+            self._winning_move = len(self._moves)
+        return True
+
+    def undo(self):
+        """Takes back the most recent move, restoring the grid and winner as
+        they were before it, and returns its (row, col). Raises IndexError if
+        there are no moves to take back.
+
+        """
+        row, col = self._moves.pop()
+        if len(self._moves) < self._winning_move:
+            self._winner, self._winning_move = False, 0
+        xo = self._marks.pop((row, col))
+        if not self._count_runs:
+            self._log_progress_to_victory(row, col, -1 if xo == 'O' else 1)
+        return row, col
+
+    def move_history(self):
+        """Returns a list of the (row, col) of every move still on the grid,
+        oldest first, the last being the one undo would take back
+
+        """
+        return self._moves[:]
+
+    # to_bytes header: MAGIC, then rows, cols (both 0 for an infinite
+    # board), connects_to_win and moves made, followed by each move's row and
+    # col as int64s, all little-endian, then each move's mark ('X' or 'O')
+    _HEADER = struct.Struct('<4s4Q')
+
+    def to_bytes(self):
+        """Returns the grid's moves as bytes, for checkpointing games or
+        sending them to other processes; 17 bytes a move whatever the board
+        size. Rebuild it with SparseGrid.from_bytes. Raises OverflowError
+        if a move's row or col doesn't fit in an int64.
+
+        """
+        moves = array('q', [coord for move in self._moves for coord in move])
+        if sys.byteorder == 'big': # always stored little-endian
+            moves.byteswap()
+        marks = ''.join([self._marks[move] for move in self._moves])
+        return b''.join([
+            self._HEADER.pack(MAGIC, self.max_row or 0, self.max_col or 0,
+                              self._connects_to_win, len(self._moves)),
+            moves.tobytes(), marks.encode('ascii')])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Returns a new grid with the state saved by to_bytes. The moves are
+        played again to rebuild it, which costs no more than reading back the
+        route counters would, as there are only a few per move.
+
+        """
+        magic, rows, cols, connects_to_win, count = \
+            cls._HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a SparseGrid.to_bytes snapshot")
+        moves = array('q')
+        pos = cls._HEADER.size
+        moves.frombytes(data[pos:pos + 16 * count])
+        marks = data[pos + 16 * count:pos + 17 * count].decode('ascii')
+        if sys.byteorder == 'big':
+            moves.byteswap()
+        if rows:
+            grid = cls(rows, cols, connects_to_win)
+        else:
+            grid = cls(connects_to_win=connects_to_win)
+        for turn in range(count):
+            grid.fill_cell(moves[2 * turn], moves[2 * turn + 1], marks[turn])
+        return grid
+
+    def __copy__(self):
+        """Returns an independent copy of the grid (copy.copy(grid))"""
+        grid = self.__class__.__new__(self.__class__)
+        grid.__dict__.update(self.__dict__)
+        grid._marks = dict(self._marks)
+        grid._routes = dict(self._routes)
+        grid._moves = self._moves[:]
+        return grid
+
+    def _log_progress_to_victory(self, row, col, v_incrementer):
+        # Grid's route counters, kept only for routes holding marks
+        routes = self._routes
+        for x in victory_routes.routes_through(row, col, self.max_row):
+            progress = routes.get(x, 0) + v_incrementer
+            if progress:
+                routes[x] = progress
+                if abs(progress) >= self._connects_to_win:
+                    self._winner = self._winner or ('O' if progress > 0
+                                                    else 'X')
+            else:
+                del routes[x]
+
+    def _log_run_to_victory(self, row, col, xo):
+        # As Grid._log_run_to_victory, looking neighbours up in the occupied
+        # cells (cells off the board are never occupied)
+        k = self._connects_to_win
+        marks = self._marks
+        for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            run = 1
+            for sign in (1, -1):
+                r, c = row + sign * d_row, col + sign * d_col
+                while run < k and marks.get((r, c)) == xo:
+                    run += 1
+                    r, c = r + sign * d_row, c + sign * d_col
+            if run >= k:
+                self._winner = self._winner or xo
+                return
+
+    def threats(self, xo, needed):
+        """Returns how many routes to victory are still open to xo and need
+        needed more of xo's marks, as Grid.threats. Worked out from the
+        occupied cells when asked for, in time proportional to the moves
+        played. Full-row grids only, raises ValueError for k-in-a-row.
+
+        """
+        n = self._connects_to_win
+        route_marks = self._route_marks()
+        if needed == n: # only routes without any mark need all n
+            return 2 * n + 2 - len(route_marks)
+        mine = 0 if xo == 'O' else 1
+        return sum(1 for marks in route_marks.values()
+                   if not marks[1 - mine] and marks[mine] == n - needed)
+
+    def evaluate(self, xo):
+        """Returns the static evaluation of the position for xo, as
+        Grid.evaluate, worked out from the occupied cells like threats.
+        Full-row grids only, raises ValueError for k-in-a-row.
+
+        """
+        evaluation = 0
+        for o, x in self._route_marks().values():
+            if not x:
+                evaluation += 4 ** (o - 1)
+            elif not o:
+                evaluation -= 4 ** (x - 1)
+        return evaluation if xo == 'O' else -evaluation
+
+    def _route_marks(self):
+        # v-route -> [O's marks, X's marks] for each route holding a mark
+        if self._count_runs:
+            raise ValueError("threats are only counted for full-row grids")
+        route_marks = {}
+        for (row, col), xo in self._marks.items():
+            for x in victory_routes.routes_through(row, col, self.max_row):
+                route_marks.setdefault(x, [0, 0])[xo == 'X'] += 1
+        return route_marks
+
+    def legal_moves(self):
+        """Returns a live view of the empty cells, see Grid.legal_moves.
+        Raises ValueError on an infinite board.
+
+        """
+        if self.max_row is None:
+            raise ValueError("an infinite grid has endless legal moves")
+        return _EmptyCells(self)
+
+    def random_legal_move(self, rng):
+        """Returns (row, col) of an empty cell picked with rng (a
+        random.Random), by drawing cells until an empty one comes up, which
+        takes a couple of draws at most unless the board is nearly full.
+        Raises ValueError if the grid is full or infinite.
+
+        """
+        empty = self.legal_moves()
+        if not len(empty):
+            raise ValueError("No empty cells to play")
+        if len(empty) * 4 < self.max_row * self.max_col: # mostly full
+            cells = list(empty)
+            return cells[rng.randrange(len(cells))]
+        while True:
+            row, col = rng.randrange(self.max_row), rng.randrange(self.max_col)
+            if (row, col) not in self._marks:
+                return row, col
+
+    def winner(self):
+        """ Returns X or O if victory conditions (connections in a row) are met
+        for either player, else returns False.
+
+        """
+        return self._winner
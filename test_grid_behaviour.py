@@ -0,0 +1,181 @@
+# fill_cell/winner behaviour tests shared by the dense and sparse grids
+# test_grid_behaviour.py
+# Python 3, run with: python3 -m pytest
+
+# Every test runs on both engine.Grid and sparse_grid.SparseGrid, which must
+# behave the same on any bounded board; the infinite board is SparseGrid's
+# alone. threats and evaluate are also checked against BitboardGrid.
+
+import random
+
+import pytest
+
+from bitboard import BitboardGrid
+from engine import Grid
+from sparse_grid import SparseGrid
+
+@pytest.fixture(params=[Grid, SparseGrid], ids=['Grid', 'SparseGrid'])
+def grid_class(request):
+    return request.param
+
+def play(grid, moves):
+    # Plays (row, col) moves in turn, O first, returning the grid
+    for turn, (row, col) in enumerate(moves):
+        assert grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+    return grid
+
+@pytest.mark.parametrize('line', [
+    [(1, 0), (1, 1), (1, 2)], # row
+    [(0, 2), (1, 2), (2, 2)], # column
+    [(0, 0), (1, 1), (2, 2)], # top left -> bottom right
+    [(0, 2), (1, 1), (2, 0)], # top right -> bottom left
+])
+def test_full_row_wins(grid_class, line):
+    others = [cell for cell in [(0, 0), (0, 1), (2, 1), (2, 0), (0, 2)]
+              if cell not in line]
+    grid = grid_class(3, 3)
+    for turn in range(2):
+        grid.fill_cell(line[turn][0], line[turn][1], 'O')
+        grid.fill_cell(others[turn][0], others[turn][1], 'X')
+        assert not grid.winner()
+    grid.fill_cell(line[2][0], line[2][1], 'O')
+    assert grid.winner() == 'O'
+
+def test_x_wins_and_first_winner_stays(grid_class):
+    grid = play(grid_class(3, 3), [(0, 0), (1, 0), (0, 1), (1, 1), (2, 2),
+                                   (1, 2)])
+    assert grid.winner() == 'X'
+    grid.fill_cell(0, 2, 'O') # O completes the top row afterwards
+    assert grid.winner() == 'X'
+
+def test_draw_has_no_winner(grid_class):
+    grid = play(grid_class(3, 3), [(0, 0), (0, 1), (0, 2), (1, 1), (1, 0),
+                                   (1, 2), (2, 1), (2, 0), (2, 2)])
+    assert grid.winner() is False
+    assert not grid.legal_moves()
+
+def test_occupied_cell_is_refused(grid_class):
+    grid = grid_class(3, 3)
+    assert grid.fill_cell(1, 1, 'O')
+    assert not grid.fill_cell(1, 1, 'X')
+    assert grid.cells[1][1] == 'O'
+    assert len(grid.legal_moves()) == 8
+
+def test_bad_mark_raises_and_leaves_cell_empty(grid_class):
+    grid = grid_class(3, 3)
+    with pytest.raises(ValueError):
+        grid.fill_cell(0, 0, 'Z')
+    assert grid.cells[0][0] == '-'
+    assert len(grid.legal_moves()) == 9
+
+@pytest.mark.parametrize('row, col', [(3, 0), (0, 3), (-1, 0), (0, -1)])
+def test_out_of_range_raises_index_error(grid_class, row, col):
+    grid = grid_class(3, 3)
+    with pytest.raises(IndexError):
+        grid.fill_cell(row, col, 'O')
+    assert len(grid.legal_moves()) == 9
+
+def test_bad_shapes_raise(grid_class):
+    with pytest.raises(ValueError):
+        grid_class(3, 4) # full row needs a square grid
+    with pytest.raises(ValueError):
+        grid_class(5, 5, 1)
+    with pytest.raises(ValueError):
+        grid_class(5, 5, 6)
+
+@pytest.mark.parametrize('line', [
+    [(2, 1), (2, 2), (2, 3), (2, 4)], # across
+    [(0, 3), (1, 3), (2, 3), (3, 3)], # down
+    [(1, 0), (2, 1), (3, 2), (4, 3)], # down right
+    [(6, 0), (5, 1), (4, 2), (3, 3)], # up right
+])
+def test_k_in_a_row_wins(grid_class, line):
+    grid = grid_class(7, 5, 4)
+    far = [(6, 4), (0, 0), (6, 3)]
+    for turn in range(3):
+        grid.fill_cell(line[turn][0], line[turn][1], 'O')
+        grid.fill_cell(far[turn][0], far[turn][1], 'X')
+        assert not grid.winner()
+    grid.fill_cell(line[3][0], line[3][1], 'O')
+    assert grid.winner() == 'O'
+
+def test_k_in_a_row_needs_unbroken_run(grid_class):
+    grid = grid_class(7, 5, 4)
+    for col in (0, 1, 3, 4): # gap at col 2
+        grid.fill_cell(3, col, 'O')
+    assert not grid.winner()
+    grid.fill_cell(3, 2, 'X') # the gap taken by the other player
+    assert not grid.winner()
+    grid.fill_cell(3, 2, 'O') # refused, the cell is taken
+    assert not grid.winner()
+
+def test_undo_restores_cell_and_winner(grid_class):
+    grid = play(grid_class(3, 3), [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)])
+    assert grid.winner() == 'O'
+    assert grid.undo() == (0, 2)
+    assert grid.winner() is False
+    assert grid.cells[0][2] == '-'
+    assert len(grid.legal_moves()) == 5
+    assert grid.fill_cell(1, 2, 'X')
+    assert grid.winner() == 'X'
+
+def test_undo_in_k_in_a_row(grid_class):
+    grid = grid_class(6, 6, 3)
+    for col in range(3):
+        grid.fill_cell(0, col, 'O')
+    assert grid.winner() == 'O'
+    grid.undo()
+    assert grid.winner() is False
+    grid.fill_cell(0, 2, 'X')
+    assert grid.winner() is False
+
+def test_infinite_board_with_negative_coordinates():
+    grid = SparseGrid(connects_to_win=5)
+    for i in range(-2, 2):
+        grid.fill_cell(i, -i, 'O') # an anti-diagonal through the origin
+        grid.fill_cell(i - 1000, 7, 'X')
+        assert not grid.winner()
+    grid.fill_cell(2, -2, 'O')
+    assert grid.winner() == 'O'
+    assert grid.cell(-2, 2) == 'O'
+    assert grid.undo() == (2, -2)
+    assert grid.winner() is False
+
+def test_infinite_board_restrictions():
+    with pytest.raises(ValueError):
+        SparseGrid() # needs connects_to_win
+    grid = SparseGrid(connects_to_win=3)
+    grid.fill_cell(10 ** 9, -10 ** 9, 'O')
+    with pytest.raises(ValueError):
+        grid.legal_moves()
+    with pytest.raises(ValueError):
+        grid.cells
+
+@pytest.mark.parametrize('other_class', [BitboardGrid, SparseGrid],
+                         ids=['BitboardGrid', 'SparseGrid'])
+def test_threats_and_evaluate_match_grid(other_class):
+    rng = random.Random(0)
+    for game in range(20):
+        grid, other = Grid(4, 4), other_class(4, 4)
+        for turn in range(rng.randrange(17)):
+            row, col = grid.random_legal_move(rng)
+            grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+            other.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+            for xo in 'OX':
+                assert other.evaluate(xo) == grid.evaluate(xo)
+                for needed in range(5):
+                    assert other.threats(xo, needed) == \
+                        grid.threats(xo, needed)
+
+def test_threats_need_full_row(grid_class):
+    grid = grid_class(7, 5, 4)
+    with pytest.raises(ValueError):
+        grid.threats('O', 1)
+    with pytest.raises(ValueError):
+        grid.evaluate('O')
+
+def test_connects_to_win_is_public(grid_class):
+    assert grid_class(3, 3).connects_to_win == 3
+    assert grid_class(7, 5, 4).connects_to_win == 4
+    with pytest.raises(AttributeError):
+        grid_class(3, 3).connects_to_win = 2
@@ -0,0 +1,31 @@
+# Tests for grid_counters.py
+# test_grid_counters.py
+# Python 3, run with: python3 -m pytest
+
+import pytest
+
+from engine import Grid
+from grid_counters import GridCounters
+
+@pytest.mark.parametrize('timers', [False, True])
+def test_moves_inside_counters(timers):
+    with GridCounters(Grid, timers) as counters:
+        grid = Grid(3, 3)
+        assert grid.fill_cell(1, 1, xo='O')
+        assert grid.fill_cell(row=0, col=0, xo='X')
+        grid.undo()
+        assert not grid.winner()
+    assert counters.counts['moves'] == 2
+    assert counters.counts['undos'] == 1
+    assert counters.counts['winner_checks'] == 1
+    assert counters.counts['route_updates'] == 4 + 3 # center, then corner
+    assert Grid.fill_cell.__name__ == 'fill_cell' # originals put back
+
+def test_k_in_a_row_counts_no_route_updates():
+    with GridCounters(Grid) as counters:
+        grid = Grid(5, 5, 3)
+        grid.fill_cell(0, 0, 'O')
+        grid.fill_cell(1, 1, 'X')
+    assert counters.counts['moves'] == 2
+    assert counters.counts['run_checks'] == 2
+    assert counters.counts['route_updates'] == 0
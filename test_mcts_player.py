@@ -0,0 +1,46 @@
+# Tests for mcts_player.py
+# test_mcts_player.py
+# Python 3, run with: python3 -m pytest
+
+import pytest
+
+from bitboard import BitboardGrid
+from compact_grid import CompactGrid
+from engine import Grid
+from mcts_player import MctsPlayer
+from sparse_grid import SparseGrid
+
+@pytest.mark.parametrize('grid_class', [Grid, BitboardGrid, CompactGrid,
+                                        SparseGrid])
+def test_tree_is_reused_between_moves(grid_class):
+    grid = grid_class(4, 4)
+    player = MctsPlayer(playouts=200)
+    for turn in range(3):
+        grid.fill_cell(*player.choose_move(grid, 'O'), xo='O')
+        row, col = next(iter(grid.legal_moves()))
+        grid.fill_cell(row, col, 'X')
+    assert player.stats()['reused_playouts'] > 0
+    assert len(grid.move_history()) == 6
+
+def test_no_reuse_after_a_different_game():
+    player = MctsPlayer(playouts=100)
+    grid = SparseGrid(4, 4)
+    grid.fill_cell(*player.choose_move(grid, 'O'), xo='O')
+    other = SparseGrid(4, 4) # a new game, unrelated to the kept tree
+    other.fill_cell(3, 3, 'O')
+    other.fill_cell(0, 0, 'X')
+    player.reset_stats()
+    assert other.fill_cell(*player.choose_move(other, 'O'), xo='O')
+    assert player.stats()['reused_playouts'] == 0
+
+def test_tiny_time_budget_still_picks_a_move():
+    grid = Grid(15, 15, 5)
+    player = MctsPlayer(seconds=1e-9)
+    assert grid.fill_cell(*player.choose_move(grid, 'O'), xo='O')
+    assert 1 <= player.stats()['playouts'] < 16
+
+@pytest.mark.parametrize('budget', [{'playouts': 0}, {'seconds': 0},
+                                    {'playouts': -1, 'seconds': 1}])
+def test_empty_budget_is_refused(budget):
+    with pytest.raises(ValueError):
+        MctsPlayer(**budget)
@@ -0,0 +1,33 @@
+# Tests for negamax_player.py
+# test_negamax_player.py
+# Python 3, run with: python3 -m pytest
+
+import pytest
+
+from compact_grid import CompactGrid
+from engine import Grid, new_grid
+from negamax_player import NegamaxPlayer
+
+def test_full_search_of_empty_3x3_is_a_draw():
+    move, score = NegamaxPlayer().analyze(new_grid(3, 3), 'O')
+    assert score == 0
+
+@pytest.mark.parametrize('grid_class', [Grid, new_grid])
+def test_depth_limit_scores_by_evaluate(grid_class):
+    # O in the center opens 4 routes, each worth 1: 4 / (4 + 1)
+    move, score = NegamaxPlayer(1).analyze(grid_class(3, 3), 'O')
+    assert move == (1, 1)
+    assert score == pytest.approx(0.8)
+
+def test_depth_limit_without_evaluate_is_a_draw():
+    move, score = NegamaxPlayer(1).analyze(CompactGrid(3, 3), 'O')
+    assert score == 0
+    move, score = NegamaxPlayer(1).analyze(Grid(5, 5, 4), 'O')
+    assert score == 0
+
+def test_heuristic_never_outranks_a_win():
+    grid = Grid(3, 3)
+    for row, col, xo in [(0, 0, 'O'), (1, 0, 'X'), (0, 1, 'O'),
+                         (1, 1, 'X')]:
+        grid.fill_cell(row, col, xo)
+    assert NegamaxPlayer(2).analyze(grid, 'O') == ((0, 2), 5)
@@ -0,0 +1,115 @@
+# Tests for grid snapshots (to_bytes/from_bytes) and copies
+# test_snapshots.py
+# Python 3, run with: python3 -m pytest
+
+import copy
+import random
+
+import pytest
+
+from bitboard import BitboardGrid
+from compact_grid import CompactGrid
+from engine import Grid, grid_from_bytes, new_grid
+from game_session import GameSession
+from nd_grid import NdGrid
+from sparse_grid import SparseGrid
+
+SNAPSHOT_CLASSES = [
+    ('Grid 3x3', Grid, (3, 3)),
+    ('Grid 9x9', Grid, (9, 9)),
+    ('Grid 9x7 k=4', Grid, (9, 7, 4)),
+    ('BitboardGrid 3x3', BitboardGrid, (3, 3)),
+    ('BitboardGrid 8x8', BitboardGrid, (8, 8)),
+    ('SparseGrid 9x9', SparseGrid, (9, 9)),
+    ('SparseGrid 9x7 k=4', SparseGrid, (9, 7, 4)),
+]
+
+def play_randomly(grid, moves, seed=0):
+    # Plays up to moves random moves (stopping at a win), O first
+    rng = random.Random(seed)
+    for turn in range(moves):
+        if grid.winner() or not grid.legal_moves(): break
+        row, col = grid.random_legal_move(rng)
+        grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+    return grid
+
+def rows_of(grid):
+    return [list(row) for row in grid.cells]
+
+def same_position(a, b):
+    return (rows_of(a) == rows_of(b) and a.winner() == b.winner() and
+            sorted(a.legal_moves()) == sorted(b.legal_moves()))
+
+@pytest.mark.parametrize('name, grid_class, shape', SNAPSHOT_CLASSES,
+                         ids=[case[0] for case in SNAPSHOT_CLASSES])
+def test_round_trip_then_undo_everything(name, grid_class, shape):
+    for seed in range(20):
+        grid = play_randomly(grid_class(*shape), 40, seed)
+        restored = grid_class.from_bytes(grid.to_bytes())
+        assert same_position(restored, grid)
+        assert restored.to_bytes() == grid.to_bytes()
+        while grid._moves: # the restored grid takes back the same moves
+            assert restored.undo() == grid.undo()
+            assert same_position(restored, grid)
+
+@pytest.mark.parametrize('n', [3, 4, 8])
+def test_bitboard_and_grid_snapshots_are_interchangeable(n):
+    for seed in range(20):
+        grid = play_randomly(Grid(n, n), n * n // 2, seed)
+        bits = BitboardGrid.from_bytes(grid.to_bytes())
+        assert same_position(bits, grid)
+        assert bits.to_bytes() == grid.to_bytes()
+        assert Grid.from_bytes(bits.to_bytes()).evaluate('O') == \
+            grid.evaluate('O')
+
+def test_grid_from_bytes_picks_the_backend():
+    assert isinstance(grid_from_bytes(Grid(3, 3).to_bytes()), BitboardGrid)
+    assert isinstance(grid_from_bytes(Grid(9, 9).to_bytes()), Grid)
+    assert isinstance(grid_from_bytes(Grid(5, 5, 4).to_bytes()), Grid)
+    grid = play_randomly(SparseGrid(9, 9), 10)
+    assert same_position(grid_from_bytes(grid.to_bytes()), grid)
+
+def test_sparse_snapshot_of_infinite_board():
+    grid = SparseGrid(connects_to_win=4)
+    for turn, (row, col) in enumerate([(-5, 10 ** 12), (0, 0), (-6, 3),
+                                       (1, 1)]):
+        grid.fill_cell(row, col, 'O' if turn % 2 == 0 else 'X')
+    restored = SparseGrid.from_bytes(grid.to_bytes())
+    assert restored._marks == grid._marks
+    assert restored.max_row is None
+
+def test_session_grid_can_checkpoint():
+    session = GameSession(3)
+    session.move(1, 1)
+    restored = grid_from_bytes(session.grid.to_bytes())
+    assert same_position(restored, session.grid)
+
+COPY_CASES = [
+    ('Grid', lambda: Grid(5, 5)),
+    ('Grid k=3', lambda: Grid(5, 5, 3)),
+    ('BitboardGrid', lambda: BitboardGrid(4, 4)),
+    ('CompactGrid', lambda: CompactGrid(4, 4)),
+    ('SparseGrid', lambda: SparseGrid(5, 5)),
+    ('new_grid', lambda: new_grid(3, 3)),
+]
+
+@pytest.mark.parametrize('name, factory', COPY_CASES,
+                         ids=[case[0] for case in COPY_CASES])
+def test_copy_is_independent(name, factory):
+    grid = play_randomly(factory(), 4, seed=1)
+    before = rows_of(grid)
+    twin = copy.copy(grid)
+    assert same_position(twin, grid)
+    twin.undo()
+    twin.undo()
+    twin.fill_cell(*twin.random_legal_move(random.Random(2)), xo='O')
+    assert rows_of(grid) == before
+    assert len(grid._moves) == 4
+
+def test_nd_copy_is_independent():
+    board = NdGrid(3, 3)
+    board.fill_cell((1, 1, 1), 'O')
+    twin = copy.copy(board)
+    twin.undo()
+    assert board.cell((1, 1, 1)) == 'O'
+    assert twin.cell((1, 1, 1)) == '-'
@@ -0,0 +1,49 @@
+# Tests for solved_positions.py
+# test_solved_positions.py
+# Python 3, run with: python3 -m pytest
+
+import io
+import os
+import random
+
+import pytest
+
+import solved_positions
+from engine import Grid
+from negamax_player import NegamaxPlayer
+
+@pytest.fixture(scope='module')
+def table_3x3(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('solved') / 'ttt3.solved')
+    count = solved_positions.build(3, path, out=io.StringIO())
+    assert count == 765 # 3x3 positions up to symmetry, the empty one too
+    assert os.path.getsize(path) == solved_positions.HEADER_SIZE + 4 * (
+        (3 ** 9 >> 8) + 2) + 2 * count
+    with solved_positions.SolvedTable(path) as table:
+        yield table
+
+def test_values_match_full_search(table_3x3):
+    player = NegamaxPlayer()
+    rng = random.Random(0)
+    for game in range(50):
+        grid = Grid(3, 3)
+        for turn in range(rng.randrange(8)):
+            grid.fill_cell(*grid.random_legal_move(rng),
+                           xo='O' if turn % 2 == 0 else 'X')
+            if grid.winner(): break
+        if grid.winner(): continue
+        xo = 'O' if len(grid.move_history()) % 2 == 0 else 'X'
+        move, score = player.analyze(grid, xo)
+        assert table_3x3.value(grid) == score
+        assert table_3x3.best_move(grid)[1] == score
+
+def test_unreachable_positions(table_3x3):
+    grid = Grid(3, 3)
+    assert table_3x3.value(grid) == 0
+    grid.fill_cell(0, 0, 'X') # X can't move first
+    assert table_3x3.value(grid) is None
+    assert table_3x3.best_move(grid) is None
+
+def test_only_small_grids_are_built(tmp_path):
+    with pytest.raises(ValueError):
+        solved_positions.build(5, str(tmp_path / 'ttt5.solved'))
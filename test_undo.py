@@ -0,0 +1,83 @@
+# Fuzz tests for undo on every grid backend
+# test_undo.py
+# Python 3, run with: python3 -m pytest
+
+# Random sequences of moves and undos, checking that each undo puts the grid
+# back exactly as it was before the move it takes back: cells, route
+# counters, the move stack and the winner.
+
+import copy
+import random
+
+import pytest
+
+from bitboard import BitboardGrid
+from compact_grid import CompactGrid
+from engine import Grid
+from nd_grid import NdGrid
+from sparse_grid import SparseGrid
+
+# (name, grid factory, state attributes) per backend and mode
+BACKENDS = [
+    ('Grid 3x3', lambda: Grid(3, 3), ('cells', '_victory_routes',
+     '_route_marks', '_threats', '_evaluation')),
+    ('Grid 7x7', lambda: Grid(7, 7), ('cells', '_victory_routes',
+     '_route_marks', '_threats', '_evaluation')),
+    ('Grid 7x5 k=4', lambda: Grid(7, 5, 4), ('cells',)),
+    ('CompactGrid 5x5', lambda: CompactGrid(5, 5), ('_cells',
+     '_victory_routes')),
+    ('BitboardGrid 4x4', lambda: BitboardGrid(4, 4), ('_o_board',
+     '_x_board')),
+    ('BitboardGrid 8x8', lambda: BitboardGrid(8, 8), ('_o_board',
+     '_x_board')),
+    ('SparseGrid 6x6', lambda: SparseGrid(6, 6), ('_marks', '_routes')),
+    ('SparseGrid 9x7 k=4', lambda: SparseGrid(9, 7, 4), ('_marks',)),
+    ('NdGrid 3^3', lambda: NdGrid(3, 3), ('_cells', '_progress')),
+]
+
+def state(grid, attributes):
+    # Everything undo must restore, copied so later moves can't change it
+    saved = {name: copy.deepcopy(getattr(grid, name))
+             for name in attributes + ('_moves', '_winning_move')}
+    saved['_moves'] = list(saved['_moves'])
+    saved['winner'] = grid.winner()
+    saved['legal_moves'] = sorted(grid.legal_moves())
+    saved['move_history'] = grid.move_history()
+    return saved
+
+def empty_cells(grid):
+    if isinstance(grid, NdGrid):
+        return grid.legal_moves()
+    return list(grid.legal_moves())
+
+def fill(grid, move, xo):
+    if isinstance(grid, NdGrid):
+        return grid.fill_cell(move, xo)
+    return grid.fill_cell(move[0], move[1], xo)
+
+@pytest.mark.parametrize('name, factory, attributes', BACKENDS,
+                         ids=[backend[0] for backend in BACKENDS])
+def test_random_make_undo_restores_state(name, factory, attributes):
+    rng = random.Random(name)
+    for game in range(30):
+        grid = factory()
+        saved = [] # state before each move still on the grid
+        for step in range(200):
+            moves = empty_cells(grid)
+            if moves and (not saved or rng.random() < 0.6):
+                saved.append(state(grid, attributes))
+                move = moves[rng.randrange(len(moves))]
+                assert fill(grid, move, 'O' if len(saved) % 2 else 'X')
+            elif saved:
+                grid.undo()
+                assert state(grid, attributes) == saved.pop()
+        while saved: # take everything back to the empty grid
+            grid.undo()
+            assert state(grid, attributes) == saved.pop()
+        assert state(grid, attributes) == state(factory(), attributes)
+
+@pytest.mark.parametrize('name, factory, attributes', BACKENDS,
+                         ids=[backend[0] for backend in BACKENDS])
+def test_undo_with_no_moves_raises(name, factory, attributes):
+    with pytest.raises(IndexError):
+        factory().undo()
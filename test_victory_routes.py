@@ -0,0 +1,55 @@
+# Regression tests for victory_routes.py
+# test_victory_routes.py
+# Python 3, run with: python3 -m pytest
+
+# The closed-form diagonal classifier must give exactly the v-routes the
+# original range-searching code found, on every cell of every odd board from
+# 3 to 101. The original code is kept below as the reference.
+
+import pytest
+
+import victory_routes
+from engine import Grid
+
+ODD_SIZES = range(3, 102, 2)
+
+def reference_routes(row, col, size):
+    # Grid._log_diagonal_progress_to_victory as it was, with the rows and
+    # columns _log_progress_to_victory logged before calling it
+    maxr, maxc = size, size
+    to_log = [row, col + maxr]
+    r, c = row + 1, col + 1
+    diag_increment_lr = maxc - 1 + 2
+    diag_increment_rl = maxc - 1
+    top_l_bot_r_diag = range(1, maxr * maxc + 1, diag_increment_lr)
+    top_r_bot_l_diag = range(maxc, maxr * (maxr-1) + 2, diag_increment_rl)
+    cell_num = c + (r - 1) * maxr
+    for i in top_l_bot_r_diag:
+        if i == cell_num:
+            to_log.append(maxr + maxc + 1 - 1)
+    for j in top_r_bot_l_diag:
+        if j == cell_num:
+            to_log.append(maxr + maxc + 2 - 1)
+    return to_log
+
+@pytest.mark.parametrize('size', ODD_SIZES)
+def test_routes_through_matches_reference(size):
+    table = victory_routes.route_table(size)
+    for row in range(size):
+        for col in range(size):
+            expected = reference_routes(row, col, size)
+            assert victory_routes.routes_through(row, col, size) == expected
+            assert list(table[row * size + col]) == expected
+
+@pytest.mark.parametrize('size', ODD_SIZES)
+def test_victory_routes_match_reference(size):
+    # fill every cell, checking the whole route array after each move
+    grid = Grid(size, size)
+    expected = [0] * (size + size + 2)
+    for cell_num in range(size * size):
+        row, col = divmod(cell_num, size)
+        xo = 'O' if cell_num % 2 == 0 else 'X'
+        grid.fill_cell(row, col, xo)
+        for x in reference_routes(row, col, size):
+            expected[x] += 1 if xo == 'O' else -1
+        assert grid._victory_routes == expected
@@ -11,111 +11,10 @@
 # gain for smaller grids. I describe on GitHub my thought process behind the
 # three coordinate systems used.
 
-import math
 import sys
 
-class Grid:
-    """Represents gameboard, can be called to fill individual cells"""
-    cells = []
-    max_row = 0
-    max_col = 0
-    _victory_routes = [] # represents each way to win (rows + cols + 2 diags)
-    _connects_to_win = 0
-        
-    def __init__(self, rows, cols):
-        """Initializes grid with the appropriate number of rows and columns
-        Note: Implementation assumes that rows are equal to columns!
-        
-        """
-        self.cells = [['-' for j in xrange(cols)] for i in xrange(rows)]
-        self.max_row = rows
-        self.max_col = cols
-        self._victory_routes = [0 for x in xrange(rows + cols + 2)]
-        self._connects_to_win = rows
-        if rows != cols: raise ValueError("rows and cols must be equal")
-
-    def fill_cell(self, row, col, xo):
-        """Fills specified cell if unoccupied, notes progress to victory
-        conditions, and return true. Returns false if cell occupied and does
-        nothing.
-
-        Arguments:
-        row -- grid row (indexed from zero, e.g. 3x3 grid goes from 0 to 2)
-        col -- grid column (indexed from zero, same as row)
-        xo -- 'X' or 'O' character to specify player
-
-        """
-        if self.cells[row][col] != '-':
-            return False # don't fill already filled spaces
-        else:
-            self.cells[row][col] = xo
-            self._log_progress_to_victory(row, col, xo)
-            return True
-
-    def _log_diagonal_progress_to_victory(self, row, col, to_log):
-        # Helper method to _log_progress_to_victory. Takes the row and col of
-        # a grid cell and a list holding the victory routes affected by the
-        # player move.
-
-        maxr, maxc = self.max_row, self.max_col
-        r, c = row + 1, col + 1 # math is easier when indexed from 1 vs 0
-        
-        # calculates diagonal ranges (when incrementing cells left to right)
-        # (e.g. for 3x3: 1 2 3, 4 5 6, 7 8 9; 1 5 9 are a
-        # diagonal). Ending cells have +1 b/c xrange goes up to 2nd arg - 1
-        # This is essentially a second coordinate system (1st is row, col) to
-        # better account for diagonal cells. Coord system is indexed from 1.
-        diag_increment_lr = maxc - 1 + 2 # cells to move for next diag cell
-        diag_increment_rl = maxc - 1 # same for right -> left direction
-        top_l_bot_r_diag = xrange(1, maxr * maxc + 1, diag_increment_lr)
-        top_r_bot_l_diag = xrange(maxc, maxr * (maxr-1) + 2, diag_increment_rl)
-        cell_num = c + (r - 1) * maxr # cell ref in increment coord system
-
-        # check if cell in diag, log if so -- center cell triggers both loops
-        if cell_num in top_l_bot_r_diag:
-            to_log.append(maxr + maxc + 1 - 1) # -1 at end to reindex to 0
-
-        if cell_num in top_r_bot_l_diag:
-            to_log.append(maxr + maxc + 2 - 1) # -1 at end to reindex to 0
-        
-    def _log_progress_to_victory(self, row, col, xo):
-        # Logs the progress of X and O to victory through incrementing an array
-        # holding 'routes' to victory (each row, column, & diagonal is a
-        # route). O is represented with positives, X with negatives. A player
-        # has won when any route contains abs(_connects_to_win). Implemented
-        # this way to scale better than calling the more intuitive but costly
-        # recursive traversal across the grid for each cell (or subset of
-        # cells) to see if it's in a row.
-
-        # This is essentially the third and final coordinate system, which
-        # gives each route to victory its own array element
-
-        # rows and columns are always v-routes, col converted to v-route coord
-        v_routes_to_log = [row, col + self.max_row]
-        self._log_diagonal_progress_to_victory(row, col, v_routes_to_log)
-        
-        v_incrementer = 0 # use proper sign for X vs O
-        if xo == 'O':
-            v_incrementer = 1
-        elif xo == 'X':
-            v_incrementer = -1
-        else:
-            raise ValueError("Needs to take X or O")
-
-        # Track progress in each route to victory
-        for x in v_routes_to_log:
-            self._victory_routes[x] += v_incrementer
-        
-    def winner(self):
-        """ Returns X or O if victory conditions (connections in a row) are met
-        for either player, else returns False.
-
-        """
-        for x in self._victory_routes:
-            if x >= self._connects_to_win: return 'O'
-            elif x <= -(self._connects_to_win): return 'X'
-
-        return False
+import board_render
+from engine import new_grid # the game itself, shared with tictactoe3.py
 
 class GameNotOver(Exception):
     """GameInterface.end_game is called and game is not over."""
@@ -127,32 +26,28 @@ class GameNotOver(Exception):
 class GameInterface:
     """Textual interface for Tic-Tac-Toe game."""
     game = 0
+    renderer = None
     
-    def __init__(self):
+    def __init__(self, ansi=False):
+        """Runs the main menu. With ansi, the board is drawn in place on an
+        ANSI terminal instead of being reprinted every turn.
+
+        """
         self.game = self.main_menu()
+        if ansi: self.renderer = board_render.AnsiRenderer()
 
     def print_game(self):
-        max_col = self.game.max_col
-        max_row = self.game.max_row
-        
-        """Prints the tic-tac-toe grid"""
-        pad_size = int(math.floor(math.log10(max_col))) + 1 # max digits
-        sys.stdout.write("\n")
-        sys.stdout.write(' ' * pad_size + ' ')
+        """Prints the tic-tac-toe grid, in one write (see board_render.py),
+        or redraws just the changed cells when using an AnsiRenderer
 
-        for cols in xrange(max_col): # print col numbers
-            sys.stdout.write(str(cols + 1).rjust(pad_size + 1))
-
-        print("\n")
+        """
+        if self.renderer:
+            self.renderer.draw(self.game)
+        else:
+            board_render.print_frame(self.game)
 
-        for rows in xrange(max_row):
-            sys.stdout.write(str(rows + 1).rjust(pad_size + 1)) # print row number
-            for col in xrange(max_col): # print grid elements
-                sys.stdout.write(str(self.game.cells[rows][col]).rjust(pad_size+1))
-            print("\n")
+        #print(self.game._victory_routes) #uncomment to see victory progression
 
-            #print(game_grid._victory_routes) #uncomment to see victory progression
-    
     def main_menu(self):
         """Runs a text-based main menu for the game, returning a Grid object
         based on user input
@@ -196,7 +91,7 @@ class GameInterface:
         while repeat_grid_select:
             try:
                 grid_size = int(raw_input(
-                    "Enter desired grid size (e.g. 3 for 3x3). Odd numbers only: "))
+                    "Enter desired grid size (e.g. 3 for 3x3): "))
                 if grid_size > 15: # starts to exceed screen sizes
                     print("Grids this large are unsupported (may look ugly).")
                     keep_going = raw_input("Continue anyway? (y/n): ")
@@ -204,16 +99,33 @@ class GameInterface:
                         grid_size = 0
                     else:
                         repeat_grid_select = False
-                elif grid_size % 2 == 0:
-                    print("Currently, the game only supports odd numbered grids.")
-                elif grid_size == 1:
+                elif grid_size < 2:
                     print("That wouldn't be very interesting.")
                 else: 
                     repeat_grid_select = False
             except ValueError:
                 print("Invalid selection.")
 
-        return Grid(grid_size, grid_size)
+        return new_grid(grid_size, grid_size,
+                        self.select_connects_to_win(grid_size))
+
+    def select_connects_to_win(self, grid_size):
+        """Takes user input for how many in a row win on a grid_size grid.
+        Returns an int, or None for a full row (classic tic-tac-toe).
+
+        """
+        while True:
+            try:
+                connects = raw_input("Enter how many in a row win "
+                                     "(blank for a full row): ")
+                if connects == "":
+                    return None
+                elif int(connects) < 2 or int(connects) > grid_size:
+                    print("Must be from 2 to {0}.".format(grid_size))
+                else:
+                    return int(connects)
+            except ValueError:
+                print("Invalid selection.")
 
     def run_game(self):
         """Main loop running the tic-tac-toe game. Takes a Grid object."""
@@ -259,16 +171,16 @@ class GameInterface:
 
     def end_game(self, turn):
         """Takes a turn number. Runs appropriate end-game messages, based on
-        status (if there is a winner or if game has exceeded its max number of
-        turns. Asks user whether or not to play again and returns True if yes, False if no.
+        status (if there is a winner or if the grid has no empty cells left).
+        Asks user whether or not to play again and returns True if yes, False
+        if no.
 
         Raises GameNotOver Exception if game isn't over.
  
         """
         winner = self.game.winner()
-        max_turns = self.game.max_row * self.game.max_col
 
-        if winner or turn >= max_turns:
+        if winner or not self.game.legal_moves():
             self.print_game()
             if winner:
                 print("Player {} wins!".format(winner))
@@ -319,9 +231,10 @@ class GameInterface:
                     
 def main():
     run = True
+    ansi = "--ansi" in sys.argv[1:] # redraw only changed cells
 
     while run: # Lets the player restart game if he or she wishes to
-        interface = GameInterface()
+        interface = GameInterface(ansi)
         run = interface.run_game()
 
 if __name__ == "__main__":
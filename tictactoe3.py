@@ -12,139 +12,31 @@
 # gain for smaller grids. I describe on GitHub my thought process behind the
 # three coordinate systems used.
 
-import math
 import sys
 
-class Grid:
-    """Represents gameboard, can be called to fill individual cells"""
-    cells = []
-    max_row = 0
-    max_col = 0
-    _victory_routes = [] # represents each way to win (rows + cols + 2 diags)
-    _connects_to_win = 0
-        
-    def __init__(self, rows, cols):
-        """Initializes grid with the appropriate number of rows and columns
-        Note: Implementation assumes that rows are equal to columns!
-        
-        """
-        self.cells = [['-' for j in range(cols)] for i in range(rows)]
-        self.max_row = rows
-        self.max_col = cols
-        self._victory_routes = [0 for x in range(rows + cols + 2)]
-        self._connects_to_win = rows
-        if rows != cols: raise ValueError("rows and cols must be equal")
+import board_render
+from engine import new_grid # the game itself
 
-    def fill_cell(self, row, col, xo):
-        """Fills specified cell if unoccupied, notes progress to victory
-        conditions, and return true. Returns false if cell occupied and does
-        nothing.
+def print_game(game_grid, renderer=None):
+    """Prints the tic-tac-toe grid, in one write (see board_render.py). Pass
+    an AnsiRenderer to redraw only the cells changed since its last frame.
 
-        Arguments:
-        row -- grid row (indexed from zero, e.g. 3x3 grid goes from 0 to 2)
-        col -- grid column (indexed from zero, same as row)
-        xo -- 'X' or 'O' character to specify player
-
-        """
-        if self.cells[row][col] != '-':
-            return False # don't fill already filled spaces
-        else:
-            self.cells[row][col] = xo
-            self._log_progress_to_victory(row, col, xo)
-            return True
-
-    def _log_diagonal_progress_to_victory(self, row, col, to_log):
-        # Helper method to _log_progress_to_victory. Takes the row and col of
-        # a grid cell and a list holding the victory routes affected by the
-        # player move.
-
-        maxr, maxc = self.max_row, self.max_col
-        r, c = row + 1, col + 1 # math is easier when indexed from 1 vs 0
-        
-        # calculates diagonal ranges (when incrementing cells left to right)
-        # (e.g. for 3x3: 1 2 3, 4 5 6, 7 8 9; 1 5 9 are a
-        # diagonal). Ending cells have +1 b/c range goes up to 2nd arg - 1
-        # This is essentially a second coordinate system (1st is row, col) to
-        # better account for diagonal cells. Coord system is indexed from 1.
-        diag_increment_lr = maxc - 1 + 2 # cells to move for next diag cell
-        diag_increment_rl = maxc - 1 # same for right -> left direction
-        top_l_bot_r_diag = range(1, maxr * maxc + 1, diag_increment_lr)
-        top_r_bot_l_diag = range(maxc, maxr * (maxr-1) + 2, diag_increment_rl)
-        cell_num = c + (r - 1) * maxr # cell ref in increment coord system
-
-        # check if cell in diag, log if so -- center cell triggers both loops
-        for i in top_l_bot_r_diag:
-            if i == cell_num:
-                to_log.append(maxr + maxc + 1 - 1) # -1 at end to reindex to 0
-
-        for j in top_r_bot_l_diag:
-            if j == cell_num:
-                to_log.append(maxr + maxc + 2 - 1) # -1 at end to reindex to 0
-        
-    def _log_progress_to_victory(self, row, col, xo):
-        # Logs the progress of X and O to victory through incrementing an array
-        # holding 'routes' to victory (each row, column, & diagonal is a
-        # route). O is represented with positives, X with negatives. A player
-        # has won when any route contains abs(_connects_to_win). Implemented
-        # this way to scale better than calling the more intuitive but costly
-        # recursive traversal across the grid for each cell (or subset of
-        # cells) to see if it's in a row.
-
-        # This is essentially the third and final coordinate system, which
-        # gives each route to victory its own array element
-
-        # rows and columns are always v-routes, col converted to v-route coord
-        v_routes_to_log = [row, col + self.max_row]
-        self._log_diagonal_progress_to_victory(row, col, v_routes_to_log)
-        
-        v_incrementer = 0 # use proper sign for X vs O
-        if xo == 'O':
-            v_incrementer = 1
-        elif xo == 'X':
-            v_incrementer = -1
-        else:
-            raise ValueError("Needs to take X or O")
-
-        # Track progress in each route to victory
-        for x in v_routes_to_log:
-            self._victory_routes[x] += v_incrementer
-        
-    def winner(self):
-        """ Returns X or O if victory conditions (connections in a row) are met
-        for either player, else returns False.
-
-        """
-        for x in self._victory_routes:
-            if x >= self._connects_to_win: return 'O'
-            elif x <= -(self._connects_to_win): return 'X'
-
-        return False
-
-def print_game(game_grid):
-    """Prints the tic-tac-toe grid"""
-    pad_size = int(math.floor(math.log10(game_grid.max_col))) + 1 # max digits
-    sys.stdout.write("\n")
-    sys.stdout.write(' ' * pad_size + ' ')
-    
-    for cols in range(game_grid.max_col): # print col numbers
-        sys.stdout.write(str(cols + 1).rjust(pad_size + 1))
-
-    print("\n")
-        
-    for rows in range(game_grid.max_row):
-        sys.stdout.write(str(rows + 1).rjust(pad_size + 1)) # print row number
-        for col in range(game_grid.max_col): # print grid elements
-            sys.stdout.write(str(game_grid.cells[rows][col]).rjust(pad_size+1))
-        print("\n")
+    """
+    if renderer:
+        renderer.draw(game_grid)
+    else:
+        board_render.print_frame(game_grid)
 
-        #print(game_grid._victory_routes) #uncomment to see victory progression
+    #print(game_grid._victory_routes) #uncomment to see victory progression
     
 def main_menu():
     """Prints and takes user input for the main menu of the game"""
     repeat_menu = True
     repeat_grid_select = True
+    repeat_win_select = True
     select = 0
     grid_size = 0
+    connects_to_win = None
     
     print("* Tic-Tac-Toe Game! *\n")
 
@@ -166,7 +58,7 @@ def main_menu():
     while repeat_grid_select:
         try:
             grid_size = int(input(
-                "Enter desired grid size (e.g. 3 for 3x3). Odd numbers only: "))
+                "Enter desired grid size (e.g. 3 for 3x3): "))
             if grid_size > 15: # starts to exceed screen sizes
                 print("Grids this large are unsupported (may look ugly).")
                 keep_going = input("Continue anyway? (y/n): ")
@@ -174,36 +66,66 @@ def main_menu():
                     grid_size = 0
                 else:
                     repeat_grid_select = False
-            elif grid_size % 2 == 0:
-                print("Currently, the game only supports odd numbered grids.")
-            elif grid_size == 1:
+            elif grid_size < 2:
                 print("That wouldn't be very interesting.")
             else: 
                 repeat_grid_select = False
         except ValueError:
             print("Invalid selection.")
 
-    return Grid(grid_size, grid_size)
+    while repeat_win_select: # full row by default, fewer for gomoku-style
+        try:
+            connects = input("Enter how many in a row win "
+                             "(blank for a full row): ")
+            if connects == "":
+                repeat_win_select = False
+            elif int(connects) < 2 or int(connects) > grid_size:
+                print("Must be from 2 to {}.".format(grid_size))
+            else:
+                connects_to_win = int(connects)
+                repeat_win_select = False
+        except ValueError:
+            print("Invalid selection.")
+
+    return new_grid(grid_size, grid_size, connects_to_win)
+
+def run_game(ansi=False):
+    """Main loop running the tic-tac-toe game. With ansi, the board is drawn
+    in place on an ANSI terminal instead of being reprinted every turn.
 
-def run_game():
-    """Main loop running the tic-tac-toe game."""
+    """
     game = main_menu()
     turn = 0
     running = True
     end_message = "Thanks for playing!"
+    computer = None
+    renderer = board_render.AnsiRenderer() if ansi else None
+
+    # the computer searches to the end of the game on grids up to 4x4, and
+    # only a couple of moves ahead on larger ones (up to 15x15)
+    if game and game.max_row * game.max_col <= 225:
+        if input("Play against the computer? (y/n): ") == "y":
+            from negamax_player import NegamaxPlayer
+            full_search = game.max_row * game.max_col <= 16
+            computer = NegamaxPlayer(None if full_search else 2)
     
     if not game:
         print("Ending game...")
     else:
-        max_turns = game.max_row * game.max_col
         while running:
             player = 'O' if turn % 2 == 0 else 'X'
-            print_game(game)
+            print_game(game, renderer)
             print("Player {}'s turn.".format(player)),
-            print("Pick row and column to tick (q to quit)")
             row_input, col_input = True, True
             row, col = 0, 0
 
+            if computer and player == 'X': # computer always plays X
+                row, col = [x + 1 for x in computer.choose_move(game, player)]
+                print("Computer picks row {}, column {}.".format(row, col))
+                row_input, col_input = False, False
+            else:
+                print("Pick row and column to tick (q to quit)")
+
             while row_input:
                 try:
                     row = input("Row: ")
@@ -235,11 +157,11 @@ def run_game():
             if filled:
                 turn += 1
                 winner = game.winner()
-                if winner or turn >= max_turns:
-                    print_game(game)
+                if winner or not game.legal_moves():
+                    print_game(game, renderer)
                     if winner:
                         print("Player {} wins!".format(winner))
-                    elif turn >= max_turns:
+                    else:
                         print("No one wins!")
                     try:
                         print("Press 1 to return to main menu,"),
@@ -257,10 +179,16 @@ def run_game():
                 print("Cell is already occupied! Try again.\n")
 
 def main():
+    if sys.argv[1:2] == ["--replay"]: # play recorded games, no prompts
+        import replay
+        replay.main(sys.argv[2:])
+        return
+
     run = True
+    ansi = "--ansi" in sys.argv[1:] # redraw only changed cells
 
     while run: # Lets the player restart game if he or she wishes to
-        run = run_game()
+        run = run_game(ansi)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,44 @@
+# Victory route lookup shared by engine.py and bitboard.py
+# victory_routes.py
+# Works under both Python 2.7 and Python 3
+
+# Each way to win on an n x n grid gets its own index (the 'v-route' coordinate
+# system): rows are 0 to n-1, columns n to 2n-1, the top-left to bottom-right
+# diagonal is 2n and the top-right to bottom-left diagonal is 2n+1.
+#
+# Diagonal membership used to be found by building the diagonal cells in the
+# row-major cell numbering (1 2 3, 4 5 6, 7 8 9 for 3x3) and searching them,
+# which costs O(n) per move. A cell is on the first diagonal exactly when
+# row == col and on the second when row + col == n - 1, so no search is needed.
+
+# Route tables are cached per grid size and shared by every Grid of that size.
+# Above this size the table would cost more memory than it saves in time, so
+# routes are worked out per move instead.
+TABLE_MAX_SIZE = 101
+
+_tables = {}
+
+def routes_through(row, col, size):
+    """Returns a list of the v-route indices passing through the cell at row,
+    col (indexed from zero) on a size x size grid.
+
+    """
+    to_log = [row, col + size] # rows and columns are always v-routes
+    if row == col:
+        to_log.append(size + size) # top left -> bottom right diagonal
+    if row + col == size - 1:
+        to_log.append(size + size + 1) # top right -> bottom left diagonal
+    return to_log
+
+def route_table(size):
+    """Returns a list indexed by row-major cell number (row * size + col)
+    holding a tuple of the v-routes through each cell, or None if size is over
+    TABLE_MAX_SIZE.
+
+    """
+    if size > TABLE_MAX_SIZE:
+        return None
+    if size not in _tables:
+        _tables[size] = [tuple(routes_through(row, col, size))
+                         for row in range(size) for col in range(size)]
+    return _tables[size]